@@ -0,0 +1,329 @@
+import argparse
+import base64
+import io
+import re
+import shlex
+import socket
+import socketserver
+import struct
+import threading
+import time
+import av
+import numpy as np
+from PIL import Image
+
+# Stand-in for the adb server plus a set of devices with synthetic screens.
+# It speaks enough of the host protocol for AdbClient: host:devices,
+# host:track-devices, host:transport*, and exec:/shell: services for
+# screencap (PNG and raw), screenrecord (live H.264), wm size and an
+# interactive sh that understands `echo` and `input`. Text typed with
+# `input text`/`keyevent` or an ADBKeyboard broadcast lands in
+# FakeScreen.typed.
+
+ADB_KEYBOARD = "com.android.adbkeyboard/.AdbIME"
+STAMP_BITS = 48
+
+
+def stamp_block(width):
+    return max(2, width // 64)
+
+
+def write_stamp(rgb, ms):
+    b = stamp_block(rgb.shape[1])
+    for i in range(STAMP_BITS):
+        rgb[0:b, i * b:(i + 1) * b] = 255 if (ms >> i) & 1 else 0
+
+
+def read_stamp(arr):
+    # Reads the wall-clock ms written by write_stamp from a decoded frame.
+    b = stamp_block(arr.shape[1])
+    centers = arr[b // 2, b // 2:STAMP_BITS * b:b, 0]
+    return sum(1 << i for i, v in enumerate(centers) if v > 127)
+
+
+class FakeScreen:
+    def __init__(self, width=720, height=1280, change_hz=10.0, stamp=False, render_ms=50.0):
+        self.width = width
+        self.height = height
+        self.change_hz = change_hz
+        self.stamp = stamp
+        self.render_delay = render_ms / 1000.0  # input to pixels, like an app's next frame
+        self.inputs = []
+        self.typed = []
+        self.ime = "com.android.inputmethod.latin/.LatinIME"
+        y = np.linspace(40, 200, height, dtype=np.uint8)[:, None]
+        x = np.linspace(20, 120, width, dtype=np.uint8)[None, :]
+        self._background = np.stack([np.broadcast_to(y, (height, width)),
+                                     np.broadcast_to(x, (height, width)),
+                                     np.full((height, width), 90, np.uint8)], axis=-1)
+        self._lock = threading.Lock()
+        self._cache_index = None
+        self._cache = {}
+
+    def content_index(self):
+        if not self.change_hz:
+            return 0
+        return int(time.monotonic() * self.change_hz)
+
+    def rgb(self):
+        index = self.content_index()
+        frame = self._background.copy()
+        size = max(8, self.width // 8)
+        x = (index * 37) % (self.width - size)
+        y = (index * 53) % (self.height - size)
+        frame[y:y + size, x:x + size] = (255, 255 - index % 256, index % 256)
+        for tx, ty, _ in self.visible_inputs()[-8:]:
+            frame[max(0, ty - 20):ty + 20, max(0, tx - 20):tx + 20] = (250, 250, 250)
+        return index, frame
+
+    def visible_inputs(self):
+        now = time.time()
+        return [i for i in self.inputs[-16:] if now - i[2] >= self.render_delay]
+
+    def _cached(self, kind, encode):
+        with self._lock:
+            index, frame = self.rgb()
+            key = (index, len(self.inputs), len(self.visible_inputs()))
+            if key != self._cache_index:
+                self._cache_index = key
+                self._cache = {}
+            if kind not in self._cache:
+                self._cache[kind] = encode(frame)
+            return self._cache[kind]
+
+    def png(self):
+        def encode(frame):
+            out = io.BytesIO()
+            Image.fromarray(frame).save(out, "PNG", compress_level=1)
+            return out.getvalue()
+        return self._cached("png", encode)
+
+    def raw(self):
+        def encode(frame):
+            rgba = np.dstack([frame, np.full(frame.shape[:2], 255, np.uint8)])
+            return struct.pack("<IIII", self.width, self.height, 1, 0) + rgba.tobytes()
+        return self._cached("raw", encode)
+
+    def telephony(self, filler=400):
+        # Shape of a real dump: per-phone sections, signal strength on one
+        # long line, band in the cell identity, plenty of other records.
+        t = time.time()
+        rsrp = int(-95 + 10 * np.sin(t / 60))
+        lines = []
+        for phone in range(2):
+            lines += [f"Phone Id={phone}", "  mCallState=0", "  mRingingCallState=0",
+                      "  mServiceState={mVoiceRegState=0(IN_SERVICE), mDataRegState=0(IN_SERVICE)}",
+                      "  mSignalStrength=SignalStrength:{mCdma=Invalid,mGsm=Invalid,mWcdma=Invalid,"
+                      f"mTdscdma=Invalid,mLte=CellSignalStrengthLte: rssi=-65 rsrp={rsrp} "
+                      f"rsrq={-10 + int(t) % 3} rssnr={12 + int(t) % 5} cqiTableIndex=2147483647 "
+                      "cqi=2147483647 ta=2147483647 level=3 parametersUseForLevel=0,"
+                      "mNr=CellSignalStrengthNr:{ csiRsrp = 2147483647 ssRsrp = 2147483647 "
+                      "ssRsrq = 2147483647 ssSinr = 2147483647 level = 0 },primary=CellSignalStrengthLte}",
+                      "  mCellIdentity=CellIdentityLte:{ mCi=1234567 mPci=17 mTac=4321 mEarfcn=1300 "
+                      "mBands=[3] mBandwidth=20000 mMcc=310 mMnc=260}"]
+            lines += [f"  record {i}: onDataConnectionStateChanged state=2 network=13" for i in range(filler)]
+        return "\n".join(lines) + "\n"
+
+    def type_text(self, args):
+        # Rough cost of a real phone: each `input`/`am` is a fresh app_process
+        # (~150 ms) and `input text` injects every character as key events.
+        time.sleep(0.15)
+        if args[:2] == ["input", "text"] and len(args) > 2:
+            time.sleep(0.008 * len(args[2]))
+            self.typed.append(args[2].replace("%s", " "))
+        elif args[:2] == ["input", "keyevent"]:
+            time.sleep(0.008 * len(args[2:]))
+            self.typed.append("".join({"66": "\n", "61": "\t"}.get(a, "") for a in args[2:]))
+        elif "ADB_INPUT_B64" in args and self.ime == ADB_KEYBOARD:
+            self.typed.append(base64.b64decode(args[-1]).decode("utf-8"))
+
+    def input(self, args):
+        if len(args) >= 3 and args[0] == "tap":
+            point = args[1:3]
+        elif len(args) >= 4 and args[0] == "motionevent":
+            point = args[2:4]
+        else:
+            return
+        with self._lock:
+            self.inputs.append((int(point[0]), int(point[1]), time.time()))
+
+    def h264(self, sock, time_limit, fps=30):
+        codec = av.CodecContext.create("libx264", "w")
+        codec.width, codec.height = self.width, self.height
+        codec.pix_fmt = "yuv420p"
+        codec.framerate = fps
+        codec.options = {"preset": "ultrafast", "tune": "zerolatency", "g": str(fps * 2)}
+        deadline = time.monotonic() + time_limit
+        n = 0
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            _, frame = self.rgb()
+            if self.stamp:
+                write_stamp(frame, int(time.time() * 1000))
+            video = av.VideoFrame.from_ndarray(frame, format="rgb24").reformat(format="yuv420p")
+            video.pts = n
+            n += 1
+            for packet in codec.encode(video):
+                sock.sendall(bytes(packet))
+            time.sleep(max(0.0, 1.0 / fps - (time.monotonic() - started)))
+
+
+class FakeAdbHandler(socketserver.BaseRequestHandler):
+    def read_request(self):
+        header = self.rfile.read(4)
+        if len(header) < 4:
+            return None
+        return self.rfile.read(int(header, 16)).decode("utf-8")
+
+    def okay(self, payload=None):
+        self.request.sendall(b"OKAY")
+        if payload is not None:
+            self.request.sendall(b"%04x" % len(payload) + payload)
+
+    def fail(self, message):
+        data = message.encode("utf-8")
+        self.request.sendall(b"FAIL%04x" % len(data) + data)
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.request.makefile("rb")
+        screens = self.server.screens
+        serial = None
+        while True:
+            service = self.read_request()
+            if service is None:
+                return
+            if service in ("host:devices", "host:track-devices"):
+                listing = "".join(f"{s}\tdevice\n" for s in screens).encode("utf-8")
+                self.okay(listing)
+                if service == "host:track-devices":
+                    self.rfile.read()
+                return
+            if service == "host:transport-any":
+                serial = next(iter(screens))
+                self.okay()
+                continue
+            if service.startswith("host:transport:"):
+                serial = service.split(":", 2)[2]
+                if serial not in screens:
+                    return self.fail(f"device '{serial}' not found")
+                self.okay()
+                continue
+            if serial is None or ":" not in service:
+                return self.fail(f"unknown service {service}")
+            self.okay()
+            return self.run(screens[serial], service.split(":", 1)[1])
+
+    def run(self, screen, command):
+        sock = self.request
+        args = shlex.split(command)
+        if args[:2] == ["screencap", "-p"]:
+            sock.sendall(screen.png())
+        elif args[:1] == ["screencap"]:
+            sock.sendall(screen.raw())
+        elif args[:1] == ["screenrecord"]:
+            limit = 180
+            if "--time-limit" in args:
+                limit = int(args[args.index("--time-limit") + 1])
+            try:
+                screen.h264(sock, limit, self.server.h264_fps)
+            except OSError:
+                pass
+        elif args == ["sh"]:
+            for raw in self.rfile:
+                out = self.shell_line(screen, raw.decode("utf-8", "replace"))
+                if out is None:
+                    break
+                if out:
+                    sock.sendall(out.encode("utf-8"))
+        else:
+            sock.sendall(self.shell_line(screen, command).encode("utf-8"))
+
+    def shell_line(self, screen, line):
+        if line.startswith(("input text", "am broadcast")):
+            return screen.type_text(shlex.split(line)) or ""
+        if ";" in line or "$(" in line:
+            # Just enough sh for DeviceRegistry's property query: `;` lists
+            # and $(...) substitution of the first command in a pipe.
+            line = re.sub(r"\$\(([^)]*)\)",
+                          lambda m: (self.shell_line(screen, m.group(1).split("|")[0]) or "").strip(), line)
+            return "".join(self.shell_line(screen, part) or "" for part in line.split(";"))
+        args = shlex.split(line)
+        if not args:
+            return ""
+        if args[0] == "exit":
+            return None
+        if args[0] == "echo":
+            return " ".join(args[1:]) + "\n"
+        if args[:2] == ["input", "keyevent"]:
+            return screen.type_text(args) or ""
+        if args[0] == "input":
+            args = [a for a in args if a != "2>&1"]
+            screen.input(args[1:])
+            return ""
+        if args[:2] == ["wm", "size"]:
+            return f"Physical size: {screen.width}x{screen.height}\n"
+        if args[:2] == ["wm", "density"]:
+            return "Physical density: 320\n"
+        if args == ["fake", "typed"]:
+            # everything typed since the last call, for the text benchmark
+            typed, screen.typed = "".join(screen.typed), []
+            return base64.b64encode(typed.encode("utf-8")).decode("ascii") + "\n"
+        if args[:2] == ["dumpsys", "telephony.registry"]:
+            return screen.telephony()
+        if args[:3] == ["ime", "list", "-s"]:
+            return f"com.android.inputmethod.latin/.LatinIME\n{ADB_KEYBOARD}\n"
+        if args[:2] == ["ime", "set"] and len(args) > 2:
+            screen.ime = args[2]
+            return f"Input method {args[2]} selected for user #0\n"
+        if args[:4] == ["settings", "get", "secure", "default_input_method"]:
+            return screen.ime + "\n"
+        if args[0] == "getprop" and len(args) > 1:
+            return {"ro.product.model": "FakePhone\n", "ro.build.version.sdk": "34\n"}.get(args[1], "\n")
+        return ""
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, devices=1, width=720, height=1280, change_hz=10.0,
+                 h264_fps=30, stamp=False, render_ms=50.0):
+        super().__init__(("127.0.0.1", port), FakeAdbHandler)
+        self.h264_fps = h264_fps
+        self.screens = {
+            f"fake-{i}": FakeScreen(width, height, change_hz, stamp, render_ms)
+            for i in range(devices)
+        }
+
+    def handle_error(self, request, client_address):
+        pass  # clients hang up mid-stream all the time
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake adb server with synthetic devices")
+    parser.add_argument("--port", type=int, default=5037)
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--width", type=int, default=720)
+    parser.add_argument("--height", type=int, default=1280)
+    parser.add_argument("--change-hz", type=float, default=10.0)
+    parser.add_argument("--h264-fps", type=int, default=30)
+    parser.add_argument("--stamp", action="store_true", help="stamp wall-clock ms into H.264 frames")
+    parser.add_argument("--render-ms", type=float, default=50.0, help="delay before input shows on screen")
+    args = parser.parse_args()
+    server = FakeAdbServer(args.port, args.devices, args.width, args.height,
+                           args.change_hz, args.h264_fps, args.stamp, args.render_ms)
+    print(f"fake adb listening on 127.0.0.1:{server.port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+import argparse
+import base64
+import collections
+import json
+import math
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from lite_mirror.adb_client import AdbClient
+from lite_mirror.adb_shell import ShellSession
+from lite_mirror.capture_pool import CapturePool
+from lite_mirror.decode_pool import DecodePool
+from lite_mirror.frame_mailbox import FrameMailbox
+from lite_mirror.gestures import GestureStreamer
+from lite_mirror.headless import HeadlessMirror
+from lite_mirror.latency_probe import LatencyProbe
+from lite_mirror.launcher import STARTUP_BUDGET_MS, measure_startup
+from lite_mirror.metrics import DeviceMetrics
+from lite_mirror.mjpeg_server import MJPEGServer
+from lite_mirror.text_inject import ADB_KEYBOARD, TextInjector
+from lite_mirror.tile_blit import TileBlitter
+from fake_adb import FakeAdbServer, read_stamp, stamp_block
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Runs each (backend, device count) scenario in a fresh interpreter against
+# a fake adb server and prints one JSON object per scenario.
+
+SCENARIOS = ("png", "raw", "h264", "input", "gesture", "text", "tap", "mjpeg", "startup")
+DISPLAY_MS = 16
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 2)
+
+
+class BenchStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cpu = {}
+        self.wall = {}
+        self.counts = {}
+        self.latencies = []
+        self.displayed = 0
+        self.captured = 0
+        self.errors = 0
+        self.counters = collections.Counter()
+        self.extra = {}
+
+    def add(self, stage, cpu, wall):
+        with self.lock:
+            self.cpu[stage] = self.cpu.get(stage, 0.0) + cpu
+            self.wall[stage] = self.wall.get(stage, 0.0) + wall
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    # The DeviceMetrics calls sources make, so BenchStats can stand in for
+    # every device's metrics. record() has no CPU time to go with the wall.
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        self.add(name, 0.0, seconds)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def per_frame(self, totals):
+        return {k: round(v * 1000 / self.counts[k], 3) for k, v in totals.items()}
+
+
+class _Stage:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.add(self.name, time.thread_time() - self.cpu, time.perf_counter() - self.wall)
+
+
+class BenchDevice:
+    # The real capture source on a HeadlessMirror; display() stands in for
+    # the Tk side and does the same dirty-tile diff a mirror would.
+    def __init__(self, serial, backend, client, stats, scale, fps, pool=None, decoder=None):
+        self.serial = serial
+        self.backend = backend
+        self.stats = stats
+        self.mirror = HeadlessMirror(serial, backend, client, pool=pool, scale=scale, target_fps=fps,
+                                     decoder=decoder, metrics=stats, on_frame=self.on_frame)
+        self.mailbox = FrameMailbox()
+        self.blitter = TileBlitter(None, None)
+        self.prev = None
+        self.probe = None
+
+    def on_frame(self, item):
+        started, img, view = item
+        if self.backend == "h264":
+            # H.264 frames carry the fake device's wall-clock capture time;
+            # the source keeps the full-size frame in last_frame.
+            full = self.mirror.last_frame
+            top = np.asarray(full.crop((0, 0, full.width, stamp_block(full.width))))
+            started = read_stamp(top) / 1000.0 - time.time() + time.perf_counter()
+        self.mailbox.put((started, img))
+
+    def display(self):
+        item = self.mailbox.take()
+        if item is None:
+            return
+        started, img = item
+        with self.stats.stage("display"):
+            arr = np.asarray(img.convert("RGB"))
+            if self.prev is not None and self.prev.shape == arr.shape:
+                self.blitter.dirty_boxes(self.prev, arr)
+            self.prev = arr
+        if self.probe is not None:
+            self.probe.observe(arr, started, self.backend)
+        self.stats.latencies.append((time.perf_counter() - started) * 1000)
+        self.stats.displayed += 1
+
+
+def run_capture(args, client, serials, stats, probes=None):
+    pool = CapturePool(max_in_flight=args.max_in_flight)
+    decode_pool = None
+    if args.decode_procs and args.backend != "h264":
+        decode_pool = DecodePool(args.decode_procs)
+        for ready in decode_pool.ready:
+            ready.result()
+    devices = [BenchDevice(s, args.backend, client, stats, args.scale, args.fps, pool,
+                           decode_pool.channel(s) if decode_pool else None) for s in serials]
+    for dev in devices:
+        dev.probe = probes and probes[dev.serial]
+        dev.mirror.start()
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        for dev in devices:
+            dev.display()
+        time.sleep(DISPLAY_MS / 1000)
+    for dev in devices:
+        dev.mirror.stop()
+    # every capture either posted a frame or found the screen unchanged
+    stats.captured += sum(dev.mailbox.posted for dev in devices) + stats.counters["identical"]
+    stats.errors += stats.counters["errors"]
+    if decode_pool:
+        decode_pool.close()
+    return sum(dev.mailbox.dropped for dev in devices)
+
+
+def run_tap(args, client, serials, stats):
+    # Tap-to-photon: taps a random spot on every device twice a second while
+    # each capture backend runs in turn, and times until the fake device's
+    # tap marker (drawn render_ms after the tap) is on a displayed frame.
+    sessions = {s: ShellSession(s, client=client) for s in serials}
+    report = {}
+    all_samples = []
+    for backend in ("png", "raw", "h264"):
+        probes = {s: LatencyProbe() for s in serials}
+        stop = threading.Event()
+
+        def tap():
+            rng = random.Random(1)
+            while not stop.wait(0.5):
+                for serial, session in sessions.items():
+                    fx, fy = rng.uniform(0.1, 0.9), rng.uniform(0.1, 0.9)
+                    probes[serial].mark("tap", fx, fy)
+                    session.send("input", "tap", int(fx * args.width), int(fy * args.height))
+
+        driver = threading.Thread(target=tap, daemon=True)
+        driver.start()
+        run_capture(argparse.Namespace(**dict(vars(args), backend=backend)), client, serials, stats, probes)
+        stop.set()
+        driver.join()
+        samples = [v for p in probes.values() for h in p.latency.values() for v in h.samples]
+        all_samples += samples
+        report[backend] = {
+            "p50": percentile(samples, 50),
+            "p99": percentile(samples, 99),
+            "count": len(samples),
+            "missed": sum(sum(p.missed.values()) for p in probes.values()),
+            "p50_by_device": {
+                s: percentile([v for h in p.latency.values() for v in h.samples], 50)
+                for s, p in probes.items()
+            },
+        }
+    stats.extra["tap_latency_ms"] = report
+    stats.extra["render_ms"] = args.render_ms
+    stats.latencies = all_samples  # latency_ms is tap-to-photon here, not capture-to-display
+    for session in sessions.values():
+        session.close()
+    return 0
+
+
+def run_mjpeg(args, client, serials, stats, viewers=4):
+    # Headless fan-out: `viewers` HTTP clients per device on localhost, one
+    # of them reading at 10 KB/s. Every device should be captured and encoded
+    # once per change; the slow viewer should skip frames, not queue them.
+    server = MJPEGServer(port=0, client=client, fps=args.fps, scale=args.scale,
+                         max_in_flight=args.max_in_flight).start()
+    received = {}
+    deadline = time.perf_counter() + args.seconds
+
+    def viewer(serial, name, slow):
+        sock = socket.create_connection(("127.0.0.1", server.port))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16384)
+        sock.sendall(f"GET /stream/{serial} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        frames = 0
+        while time.perf_counter() < deadline:
+            frames += sock.recv(1024 if slow else 1 << 20).count(b"Content-Length")
+            if slow:
+                time.sleep(0.1)
+        sock.close()
+        received[name] = frames
+
+    threads = [threading.Thread(target=viewer, args=(s, f"{s}/{i}", i == 0))
+               for s in serials for i in range(viewers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    server.shutdown()
+    feeds = server.feeds.values()
+    fast = [n for name, n in received.items() if not name.endswith("/0")]
+    stats.displayed = sum(fast)
+    stats.captured = sum(f.encoded + f.unchanged for f in feeds)
+    stats.extra["viewers"] = viewers * len(serials)
+    stats.extra["encoded"] = sum(f.encoded for f in feeds)
+    stats.extra["fast_viewer_frames"] = min(fast) if fast else 0
+    stats.extra["slow_viewer_frames"] = min(n for name, n in received.items() if name.endswith("/0"))
+    stats.extra["skipped"] = sum(f.skipped for f in feeds)
+    return 0
+
+
+def run_startup(args, client, serials, stats, runs=5):
+    # Cold launcher start in a fresh interpreter, median of `runs`: imports,
+    # the first device list from the fake server, and which heavy modules
+    # got loaded on the way (there should be none).
+    os.environ["ANDROID_ADB_SERVER_PORT"] = str(args.port)
+    results = [measure_startup() for _ in range(runs)]
+    for key in ("import_ms", "devices_ms", "total_ms"):
+        stats.extra[key] = percentile([r[key] for r in results], 50)
+    stats.extra["budget_ms"] = STARTUP_BUDGET_MS
+    stats.extra["heavy_modules"] = sorted({m for r in results for m in r["heavy"]})
+    stats.extra["devices_listed"] = min(r["devices"] for r in results)
+    return 0
+
+
+def run_input(args, client, serials, stats):
+    sessions = [ShellSession(s, client=client) for s in serials]
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        cmds = [s.send("input", "tap", 100, 200, ack=True) for s in sessions]
+        for cmd in cmds:
+            if cmd.wait(5.0) and cmd.ok():
+                stats.latencies.append(cmd.latency * 1000)
+                stats.displayed += 1
+            else:
+                stats.errors += 1
+    for session in sessions:
+        session.close()
+    return 0
+
+
+def run_gesture(args, client, serials, stats):
+    # Drags a pointer in circles at 240 Hz; GestureStreamer coalesces that
+    # down to what the device keeps up with. Latency is per motionevent sent,
+    # "dropped" counts the coalesced moves.
+    sessions = [ShellSession(s, client=client) for s in serials]
+    metrics = [DeviceMetrics(s, window=1_000_000) for s in serials]
+    gestures = [GestureStreamer(sess, metrics=m) for sess, m in zip(sessions, metrics)]
+    cx, cy, r = args.width // 2, args.height // 2, args.width // 4
+    x, y = cx + r, cy
+    for g in gestures:
+        g.down(x, y)
+    step = 0
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        step += 1
+        x, y = int(cx + r * math.cos(step / 40)), int(cy + r * math.sin(step / 40))
+        for g in gestures:
+            g.move(x, y)
+        time.sleep(1 / 240)
+    for g in gestures:
+        g.up(x, y)
+    time.sleep(0.5)
+    for m in metrics:
+        if "touch" in m.stages:
+            stats.latencies.extend(m.stages["touch"].samples)
+    stats.displayed = sum(g.moves_sent for g in gestures)
+    for session in sessions:
+        session.close()
+    return sum(g.moves_coalesced for g in gestures)
+
+
+TEXT_SAMPLE = ("Order #42: 3 x \"widgets\" @ $5 & 2 x 'gizmos'; 100%s sure (ok?) | done\n"
+               "\tpath=C:\\tmp\\x  <b>bold</b>  {a: [1, 2]} ~`!^*\n") * 4
+
+
+def type_with(session, client, serial, mode, text):
+    # Seconds to type `text` one way, and whether the device got exactly it.
+    # "legacy" is the old paste: one `input text` with spaces as %s.
+    session.run("ime", "set", ADB_KEYBOARD if mode == "ime" else "com.android.inputmethod.latin/.LatinIME")
+    session.run("fake", "typed")
+    started = time.perf_counter()
+    if mode == "legacy":
+        client.shell(serial, "input text " + shlex.quote(text.replace(" ", "%s")))
+        seconds = time.perf_counter() - started
+    else:
+        cmd, seconds = TextInjector(session).inject_sync(text)
+        if cmd is None or not cmd.ok():
+            return None, False
+    typed = base64.b64decode(session.run("fake", "typed")).decode("utf-8")
+    return seconds, typed == text
+
+
+def run_text(args, client, serials, stats):
+    # Types the same paste on every device three ways: legacy, TextInjector
+    # over `input text` chunks, and TextInjector through ADBKeyboard.
+    # Latency is per paste; the rates are in chars_per_s.
+    modes = ("legacy", "input", "ime")
+    results = {mode: [] for mode in modes}
+    sessions = [ShellSession(s, client=client) for s in serials]
+
+    def device(serial, session):
+        for mode in modes:
+            seconds, correct = type_with(session, client, serial, mode, TEXT_SAMPLE)
+            with stats.lock:
+                if seconds is None:
+                    stats.errors += 1
+                    continue
+                results[mode].append((seconds, correct))
+                stats.latencies.append(seconds * 1000)
+
+    threads = [threading.Thread(target=device, args=pair) for pair in zip(serials, sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats.extra["chars"] = len(TEXT_SAMPLE)
+    stats.extra["chars_per_s"] = {
+        mode: round(len(TEXT_SAMPLE) * len(r) / sum(s for s, _ in r), 1) if r else None
+        for mode, r in results.items()
+    }
+    stats.extra["correct"] = {mode: all(c for _, c in r) for mode, r in results.items()}
+    for session in sessions:
+        session.close()
+    return 0
+
+
+def run_worker(args):
+    client = AdbClient(port=args.port)
+    serials = [f"fake-{i}" for i in range(args.devices)]
+    stats = BenchStats()
+    cpu_start = time.process_time()
+    if args.backend == "input":
+        dropped = run_input(args, client, serials, stats)
+    elif args.backend == "gesture":
+        dropped = run_gesture(args, client, serials, stats)
+    elif args.backend == "text":
+        dropped = run_text(args, client, serials, stats)
+    elif args.backend == "tap":
+        dropped = run_tap(args, client, serials, stats)
+    elif args.backend == "mjpeg":
+        dropped = run_mjpeg(args, client, serials, stats)
+    elif args.backend == "startup":
+        dropped = run_startup(args, client, serials, stats)
+    else:
+        dropped = run_capture(args, client, serials, stats)
+    result = {
+        "backend": args.backend,
+        "decode_procs": args.decode_procs,
+        "devices": args.devices,
+        "seconds": args.seconds,
+        "resolution": f"{args.width}x{args.height}",
+        "change_hz": args.change_hz,
+        "fps": round(stats.displayed / args.seconds, 2),
+        "fps_per_device": round(stats.displayed / args.seconds / args.devices, 2),
+        "captured_fps": round(stats.captured / args.seconds, 2),
+        "latency_ms": {"p50": percentile(stats.latencies, 50), "p99": percentile(stats.latencies, 99)},
+        "stage_cpu_ms": stats.per_frame(stats.cpu),
+        "stage_wall_ms": stats.per_frame(stats.wall),
+        "process_cpu_s": round(time.process_time() - cpu_start, 3),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        "dropped": dropped,
+        "errors": stats.errors,
+    }
+    result.update(stats.extra)
+    print(json.dumps(result), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture backends against a fake adb device")
+    parser.add_argument("--backends", default=",".join(SCENARIOS))
+    parser.add_argument("--devices", default="1,4,16")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--width", type=int, default=720)
+    parser.add_argument("--height", type=int, default=1280)
+    parser.add_argument("--scale", type=float, default=0.35)
+    parser.add_argument("--change-hz", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="target fps for polling backends")
+    parser.add_argument("--render-ms", type=float, default=50.0,
+                        help="how long the fake devices take to show a tap (part of tap latency)")
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--decode-procs", type=int, default=0,
+                        help="decode/resize png and raw frames in this many worker processes")
+    parser.add_argument("--output", help="append JSON lines here as well as stdout")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.devices = int(args.devices)
+        return run_worker(args)
+
+    counts = [int(n) for n in args.devices.split(",")]
+    server = FakeAdbServer(0, max(counts), args.width, args.height, args.change_hz, stamp=True,
+                           render_ms=args.render_ms).start()
+    out = open(args.output, "a") if args.output else None
+    try:
+        for backend in args.backends.split(","):
+            for n in counts:
+                cmd = [sys.executable, os.path.abspath(__file__), "--worker",
+                       "--backend", backend, "--devices", str(n), "--port", str(server.port),
+                       "--seconds", str(args.seconds), "--width", str(args.width),
+                       "--height", str(args.height), "--scale", str(args.scale),
+                       "--change-hz", str(args.change_hz), "--fps", str(args.fps),
+                       "--render-ms", str(args.render_ms),
+                       "--max-in-flight", str(args.max_in_flight),
+                       "--decode-procs", str(args.decode_procs)]
+                line = subprocess.run(cmd, stdout=subprocess.PIPE, universal_newlines=True).stdout.strip()
+                print(line, flush=True)
+                if out:
+                    out.write(line + "\n")
+    finally:
+        if out:
+            out.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Kept empty so that importing the package stays cheap; see launcher.py.
@@ -0,0 +1,160 @@
+import os
+import queue
+import socket
+import threading
+import time
+
+
+class AdbError(RuntimeError):
+    pass
+
+
+def recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed by adb server")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_all(sock, chunk_size=1 << 20):
+    parts = []
+    while True:
+        chunk = sock.recv(chunk_size)
+        if not chunk:
+            return b"".join(parts)
+        parts.append(chunk)
+
+
+def read_hex_block(sock):
+    size = int(recv_exact(sock, 4), 16)
+    return recv_exact(sock, size)
+
+
+def parse_devices(data):
+    devices = []
+    for line in data.decode("utf-8", "replace").splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            devices.append((parts[0], parts[1]))
+    return devices
+
+
+class AdbClient:
+    # Speaks the adb host protocol to the adb server directly instead of
+    # forking the adb binary. The server closes a connection once a service
+    # finishes, so the pool keeps a few connections already open to save the
+    # connect on the hot path.
+    def __init__(self, host="127.0.0.1", port=None, spare_connections=2, timeout=10.0):
+        self.host = host
+        self.port = port or int(os.environ.get("ANDROID_ADB_SERVER_PORT", 5037))
+        self.timeout = timeout
+        self._idle = queue.Queue(maxsize=spare_connections)
+        self._filler = None
+        self._filler_lock = threading.Lock()
+
+    def _new_socket(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _fill_pool(self):
+        while True:
+            try:
+                self._idle.put(self._new_socket())
+            except OSError:
+                time.sleep(1.0)
+
+    def _connect(self):
+        if self._idle.maxsize and self._filler is None:
+            with self._filler_lock:
+                if self._filler is None:
+                    self._filler = threading.Thread(target=self._fill_pool, daemon=True)
+                    self._filler.start()
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_socket(), False
+
+    @staticmethod
+    def _request(sock, service):
+        data = service.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise AdbError(read_hex_block(sock).decode("utf-8", "replace"))
+        raise AdbError(f"unexpected adb server reply {status!r}")
+
+    def _open(self, *services):
+        sock, pooled = self._connect()
+        try:
+            self._request(sock, services[0])
+        except (OSError, AdbError) as e:
+            sock.close()
+            if not pooled or isinstance(e, AdbError):
+                raise
+            sock = self._new_socket()  # pooled socket went stale
+            self._request(sock, services[0])
+        try:
+            for service in services[1:]:
+                self._request(sock, service)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def host_query(self, service):
+        sock = self._open(service)
+        try:
+            return read_hex_block(sock)
+        finally:
+            sock.close()
+
+    def devices(self):
+        return parse_devices(self.host_query("host:devices"))
+
+    def track_devices(self):
+        sock = self._open("host:track-devices")
+        sock.settimeout(None)
+        try:
+            while True:
+                yield parse_devices(read_hex_block(sock))
+        finally:
+            sock.close()
+
+    def open_service(self, serial, service, stream=False):
+        # One-shot services keep the client timeout so a wedged device can't
+        # hang a capture worker; long-lived streams may be quiet for minutes.
+        transport = f"host:transport:{serial}" if serial else "host:transport-any"
+        sock = self._open(transport, service)
+        if stream:
+            sock.settimeout(None)
+        return sock
+
+    def exec_out(self, serial, command):
+        sock = self.open_service(serial, "exec:" + command)
+        try:
+            return recv_all(sock)
+        finally:
+            sock.close()
+
+    def shell(self, serial, command):
+        sock = self.open_service(serial, "shell:" + command)
+        try:
+            return recv_all(sock).decode("utf-8", "replace")
+        finally:
+            sock.close()
+
+
+_default_client = None
+
+
+def default_client():
+    global _default_client
+    if _default_client is None:
+        _default_client = AdbClient()
+    return _default_client
@@ -0,0 +1,262 @@
+import itertools
+import queue
+import shlex
+import socket
+import threading
+import time
+from .adb_client import AdbError, default_client
+
+
+class ShellCommand:
+    def __init__(self, line, ack=False, callback=None):
+        self.line = line
+        self.ack = ack
+        self.callback = callback
+        self.output = []
+        self.error = None
+        self.queued_at = time.monotonic()
+        self.sent_at = None
+        self.done_at = None
+        self._done = threading.Event()
+
+    @property
+    def latency(self):
+        if self.done_at is None:
+            return None
+        return self.done_at - self.queued_at
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def ok(self):
+        return self._done.is_set() and self.error is None
+
+    def _finish(self, error=None):
+        if self._done.is_set():
+            return
+        self.error = error
+        self.done_at = time.monotonic()
+        self._done.set()
+        if self.callback:
+            try:
+                self.callback(self)
+            except Exception as e:
+                print("Shell callback error:", e)
+
+
+class ShellSession:
+    # One long-lived `sh` per serial, opened as an exec: service through the
+    # adb server. Commands are written to its stdin in order by a single
+    # writer thread; acknowledged commands are wrapped in echo markers which
+    # the reader thread matches on stdout.
+    BEGIN_PREFIX = "__hm_begin_"
+    ACK_PREFIX = "__hm_ack_"
+
+    def __init__(self, serial=None, reconnect_delay=0.5, client=None):
+        self.serial = serial
+        self.client = client or default_client()
+        self.reconnect_delay = reconnect_delay
+        self.reconnects = 0
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._sock = None
+        self._closed = threading.Event()
+        self._aborted = threading.Event()
+        self._eof = threading.Event()
+        self._close_timeout = 2.0
+        self._refs = 0
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    @property
+    def closed(self):
+        return self._closed.is_set()
+
+    def send(self, *args, ack=False, callback=None):
+        line = " ".join(shlex.quote(str(a)) for a in args)
+        return self.send_line(line, ack=ack, callback=callback)
+
+    def send_line(self, line, ack=False, callback=None):
+        cmd = ShellCommand(line, ack=ack or callback is not None, callback=callback)
+        if self.closed:
+            cmd._finish("session closed")
+        else:
+            self._queue.put(cmd)
+        return cmd
+
+    def run(self, *args, timeout=5.0):
+        cmd = self.send(*args, ack=True)
+        if not cmd.wait(timeout):
+            raise TimeoutError(f"[{self.serial}] no reply to: {cmd.line}")
+        if cmd.error:
+            raise RuntimeError(f"[{self.serial}] {cmd.error}")
+        return "\n".join(cmd.output)
+
+    def close(self, timeout=2.0):
+        # Returns at once. Commands queued before close() are still sent;
+        # the writer then sends `exit` and hangs up once sh has run them.
+        # A device that hasn't got there within timeout is cut off.
+        if self.closed:
+            return
+        self._close_timeout = timeout
+        self._closed.set()
+        self._queue.put(None)
+        timer = threading.Timer(timeout, self._abort)
+        timer.daemon = True
+        timer.start()
+
+    def _abort(self):
+        self._aborted.set()
+        sock = self._sock
+        if sock is not None:
+            self._drop(sock)
+
+    def _hang_up(self):
+        sock = self._sock
+        if sock is None or sock.fileno() == -1 or self._aborted.is_set():
+            return
+        try:
+            sock.sendall(b"exit\n")
+            self._eof.wait(self._close_timeout)  # sh exits after the last ack
+        except OSError:
+            pass
+        self._drop(sock)
+
+    def _spawn(self):
+        sock = self.client.open_service(self.serial, "exec:sh", stream=True)
+        threading.Thread(target=self._read_loop, args=(sock,), daemon=True).start()
+        return sock
+
+    @staticmethod
+    def _drop(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def _ensure_sock(self):
+        if self._sock is not None and self._sock.fileno() != -1:
+            return self._sock
+        if self._sock is not None:
+            self.reconnects += 1
+            time.sleep(self.reconnect_delay)
+        self._sock = self._spawn()
+        return self._sock
+
+    def _write_loop(self):
+        while True:
+            cmd = self._queue.get()
+            if cmd is None:
+                self._hang_up()
+                break
+            data = cmd.line + "\n"
+            token = None
+            if cmd.ack:
+                token = next(self._ids)
+                data = (f"echo {self.BEGIN_PREFIX}{token}__\n" + data +
+                        f"echo {self.ACK_PREFIX}{token}__\n")
+            while not self._aborted.is_set():
+                try:
+                    sock = self._ensure_sock()
+                    if token is not None:
+                        with self._pending_lock:
+                            self._pending[token] = (sock, cmd)
+                    sock.sendall(data.encode("utf-8"))
+                    cmd.sent_at = time.monotonic()
+                    break
+                except (OSError, AdbError) as e:
+                    with self._pending_lock:
+                        self._pending.pop(token, None)
+                    if self._sock is not None:
+                        self._drop(self._sock)
+                    if self.closed:
+                        break  # closing: no reconnect for the leftovers
+                    print(f"[{self.serial}] Shell session lost, reconnecting:", e)
+                    if self._sock is None:
+                        time.sleep(self.reconnect_delay)  # device not there (yet)
+            if cmd.sent_at is None:
+                cmd._finish("session closed")
+            elif not cmd.ack:
+                cmd._finish()
+        self._fail_pending(None, "session closed")
+        while True:  # raced in after close()
+            try:
+                cmd = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if cmd is not None:
+                cmd._finish("session closed")
+
+    def _read_loop(self, sock):
+        current = None
+        try:
+            for raw in sock.makefile("rb"):
+                current = self._handle_line(raw, current)
+        except OSError:
+            pass
+        self._drop(sock)
+        self._fail_pending(sock, "shell session lost")
+        if self.closed:
+            self._eof.set()
+
+    def _handle_line(self, raw, current):
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        token = self._marker(line, self.BEGIN_PREFIX)
+        if token is not None:
+            with self._pending_lock:
+                entry = self._pending.get(token)
+            return entry[1] if entry else None
+        token = self._marker(line, self.ACK_PREFIX)
+        if token is not None:
+            with self._pending_lock:
+                entry = self._pending.pop(token, None)
+            if entry:
+                entry[1]._finish()
+            return None
+        if current is not None:
+            current.output.append(line)
+        return current
+
+    @staticmethod
+    def _marker(line, prefix):
+        if not (line.startswith(prefix) and line.endswith("__")):
+            return None
+        try:
+            return int(line[len(prefix):-2])
+        except ValueError:
+            return None
+
+    def _fail_pending(self, sock, error):
+        with self._pending_lock:
+            lost = [t for t, (s, _) in self._pending.items() if sock is None or s is sock]
+            entries = [self._pending.pop(t) for t in lost]
+        for _, cmd in entries:
+            cmd._finish(error)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(serial=None):
+    with _sessions_lock:
+        session = _sessions.get(serial)
+        if session is None or session.closed:
+            session = ShellSession(serial)
+            _sessions[serial] = session
+        session._refs += 1
+        return session
+
+
+def release_session(serial=None):
+    with _sessions_lock:
+        session = _sessions.get(serial)
+        if session is None:
+            return
+        session._refs -= 1
+        if session._refs > 0:
+            return
+        del _sessions[serial]
+    session.close()
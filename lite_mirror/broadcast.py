@@ -0,0 +1,89 @@
+import threading
+import time
+from .metrics import RollingHistogram
+
+
+class DeliveryStats:
+    def __init__(self):
+        self.latency = RollingHistogram(128)
+        self.failed = 0
+        self.last_error = None
+        self.last_ack = None
+        self.last_sent = None
+
+
+class BroadcastGroup:
+    # Mirrors input from a leader mirror to every member. Each device has its
+    # own ShellSession writer and GestureStreamer, so the fan-out is a queue
+    # put per device and a slow or hung phone only delays itself. Every
+    # command is acknowledged; per-device latency and failures are kept in
+    # `stats` for report().
+    def __init__(self):
+        self.members = []
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def leader(self):
+        return self.members[0] if self.members else None
+
+    def add(self, mirror):
+        with self._lock:
+            self.members.append(mirror)
+            self.stats.setdefault(mirror.serial, DeliveryStats())
+        mirror.gesture.on_result = lambda cmd, serial=mirror.serial: self._record(serial, cmd)
+
+    def remove(self, mirror):
+        with self._lock:
+            if mirror in self.members:
+                self.members.remove(mirror)
+        mirror.gesture.on_result = None
+
+    def send(self, *args):
+        # Same command on every member, e.g. a keyevent or toolbar action.
+        for mirror in list(self.members):
+            mirror.rate.poke()
+            self.stats[mirror.serial].last_sent = time.time()
+            mirror.shell.send(*args, callback=lambda cmd, serial=mirror.serial: self._record(serial, cmd))
+
+    def type_text(self, text):
+        for mirror in list(self.members):
+            mirror.rate.poke()
+            self.stats[mirror.serial].last_sent = time.time()
+            mirror.text.inject(text, lambda cmd, seconds, serial=mirror.serial: self._record(serial, cmd))
+
+    def touch(self, action, fx, fy):
+        # fx, fy are fractions of the leader's device screen (not of its
+        # window, which may be zoomed); each member scales them to its own.
+        for mirror in list(self.members):
+            x, y = int(fx * mirror.dev_w), int(fy * mirror.dev_h)
+            if action != "move":
+                self.stats[mirror.serial].last_sent = time.time()
+            getattr(mirror.gesture, action)(x, y)
+
+    def _record(self, serial, cmd):
+        stats = self.stats.get(serial)
+        if stats is None:
+            return
+        if cmd.error is None:
+            stats.latency.add(cmd.latency * 1000)
+            stats.last_ack = time.time()
+        else:
+            stats.failed += 1
+            stats.last_error = cmd.error
+
+    def report(self):
+        now = time.time()
+        lines = []
+        for serial, stats in sorted(self.stats.items()):
+            s = stats.latency.summary()
+            p50 = f"{s['p50']:6.1f}" if s else "     -"
+            p95 = f"{s['p95']:6.1f}" if s else "     -"
+            line = f"{serial[:14]:<14} {p50} ms p95 {p95} {stats.failed} fail"
+            if stats.last_error:
+                line += f" ({stats.last_error})"
+            waiting = stats.last_sent and (stats.last_ack or 0) < stats.last_sent
+            if waiting and now - stats.last_sent > 3:
+                line += f" no ack for {now - stats.last_sent:.0f}s"
+            lines.append(line)
+        return "\n".join(lines)
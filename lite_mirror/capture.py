@@ -0,0 +1,97 @@
+import io
+import struct
+from PIL import Image
+
+# android.graphics.PixelFormat codes written by `screencap` in raw mode,
+# mapped to (PIL mode, raw decoder mode, bytes per pixel).
+RAW_FORMATS = {
+    1: ("RGBA", "RGBA", 4),    # RGBA_8888
+    2: ("RGBX", "RGBX", 4),    # RGBX_8888
+    3: ("RGB", "RGB", 3),      # RGB_888
+    4: ("RGB", "BGR;16", 2),   # RGB_565
+    5: ("RGBA", "BGRA", 4),    # BGRA_8888
+}
+
+# Pre-P devices write width/height/format (12 bytes); newer ones append a
+# colour space word (16 bytes).
+RAW_HEADER_SIZES = (12, 16)
+
+
+class RawFormatError(ValueError):
+    pass
+
+
+def parse_raw_header(data):
+    if len(data) < 12:
+        raise RawFormatError(f"short raw frame ({len(data)} bytes)")
+    w, h, fmt = struct.unpack_from("<III", data)
+    if fmt not in RAW_FORMATS:
+        raise RawFormatError(f"unsupported pixel format {fmt}")
+    bpp = RAW_FORMATS[fmt][2]
+    for header in RAW_HEADER_SIZES:
+        if len(data) == header + w * h * bpp:
+            return w, h, fmt, header
+    raise RawFormatError(f"unexpected raw frame size {len(data)} for {w}x{h} format {fmt}")
+
+
+def decode_raw(data):
+    w, h, fmt, header = parse_raw_header(data)
+    mode, rawmode, _ = RAW_FORMATS[fmt]
+    # Zero-copy when the raw layout matches the PIL mode (RGBA/RGBX).
+    return Image.frombuffer(mode, (w, h), memoryview(data)[header:], "raw", rawmode, 0, 1)
+
+
+def clamp_box(box, w, h):
+    x0, y0, x1, y1 = box
+    x0, x1 = min(max(int(x0), 0), w - 1), min(max(int(x1), 1), w)
+    y0, y1 = min(max(int(y0), 0), h - 1), min(max(int(y1), 1), h)
+    return x0, y0, max(x1, x0 + 1), max(y1, y0 + 1)
+
+
+def decode_raw_region(data, box):
+    # Only the (x0, y0, x1, y1) rectangle, read in place: the buffer starts
+    # at its first pixel and the stride skips the rest of each row, so the
+    # cost follows the region's area rather than the screen's.
+    w, h, fmt, header = parse_raw_header(data)
+    mode, rawmode, bpp = RAW_FORMATS[fmt]
+    x0, y0, x1, y1 = clamp_box(box, w, h)
+    stride = w * bpp
+    start = header + (y0 * w + x0) * bpp
+    if len(data) - start < stride * (y1 - y0):
+        # PIL wants whole strides; at the bottom edge map the full rows
+        rows = memoryview(data)[header + y0 * stride:header + y1 * stride]
+        band = Image.frombuffer(mode, (w, y1 - y0), rows, "raw", rawmode, 0, 1)
+        return band.crop((x0, 0, x1, y1 - y0))
+    return Image.frombuffer(mode, (x1 - x0, y1 - y0), memoryview(data)[start:], "raw", rawmode, stride, 1)
+
+
+def decode_png(data):
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def peek_size(backend, data):
+    # Frame size from the header alone, without decoding.
+    if backend == "raw":
+        return parse_raw_header(data)[:2]
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or len(data) < 24:
+        raise ValueError("not a PNG")
+    return struct.unpack_from(">II", data, 16)
+
+
+def decode_region(backend, data, box):
+    if backend == "raw":
+        return decode_raw_region(data, box)
+    # PNG has to be inflated whole; crop straight after so nothing else
+    # touches the full frame.
+    img = decode_png(data)
+    return img.crop(clamp_box(box, *img.size))
+
+
+# backend name -> (device command, decoder)
+BACKENDS = {
+    "raw": ("screencap", decode_raw),
+    "png": ("screencap -p", decode_png),
+}
+
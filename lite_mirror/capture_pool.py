@@ -0,0 +1,106 @@
+import collections
+import threading
+import time
+
+
+class CaptureJob:
+    def __init__(self, serial, capture, rate):
+        self.serial = serial
+        self.capture = capture
+        self.rate = rate
+        self.busy = False
+        self.frames = 0
+        self.errors = 0
+        self.capture_ms = 0.0
+        self.done_times = collections.deque(maxlen=64)
+
+    def fps(self, window=5.0):
+        now = time.monotonic()
+        recent = [t for t in self.done_times if now - t <= window]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / (recent[-1] - recent[0])
+
+
+class CapturePool:
+    # Owns capture for every open mirror. max_in_flight worker threads pick
+    # devices whose FrameRateController says a frame is due: the focused
+    # device first, the rest in round-robin order. Capacity is shared, so
+    # twenty mirrors still never run more than max_in_flight captures.
+    def __init__(self, max_in_flight=4):
+        self.max_in_flight = max_in_flight
+        self._jobs = []
+        self._focused = None
+        self._cond = threading.Condition()
+        for _ in range(max_in_flight):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def register(self, serial, capture, rate):
+        job = CaptureJob(serial, capture, rate)
+        rate.on_poke = self.wake
+        with self._cond:
+            self._jobs.append(job)
+            self._cond.notify()
+        return job
+
+    def unregister(self, job):
+        with self._cond:
+            if job in self._jobs:
+                self._jobs.remove(job)
+        job.rate.on_poke = None
+
+    def set_focus(self, serial):
+        with self._cond:
+            self._focused = serial
+            self._cond.notify()
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            jobs = list(self._jobs)
+        return {
+            job.serial: {
+                "fps": round(job.fps(), 1),
+                "frames": job.frames,
+                "errors": job.errors,
+                "capture_ms": round(job.capture_ms, 1),
+            }
+            for job in jobs
+        }
+
+    def _next_job(self):
+        now = time.monotonic()
+        ready = [j for j in self._jobs if not j.busy and j.rate.due <= now]
+        if not ready:
+            waits = [j.rate.due - now for j in self._jobs if not j.busy]
+            return None, min(waits + [0.5])
+        job = next((j for j in ready if j.serial == self._focused), ready[0])
+        self._jobs.remove(job)
+        self._jobs.append(job)
+        job.busy = True
+        return job, 0
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job, delay = self._next_job()
+                while job is None:
+                    self._cond.wait(delay)
+                    job, delay = self._next_job()
+            started = time.monotonic()
+            try:
+                job.capture()
+                job.frames += 1
+            except Exception as e:
+                job.errors += 1
+                job.rate.frame_failed()
+                print(f"[{job.serial}] Capture error:", e)
+            finished = time.monotonic()
+            job.capture_ms += ((finished - started) * 1000 - job.capture_ms) * 0.2
+            job.done_times.append(finished)
+            with self._cond:
+                job.busy = False
+                self._cond.notify()
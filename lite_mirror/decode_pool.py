@@ -0,0 +1,195 @@
+import collections
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from PIL import Image
+from .capture import BACKENDS
+
+# Worker-side cache of attached segments, by name. Slots are reused for the
+# life of a channel, so after the first frame a job attaches nothing.
+_attached = collections.OrderedDict()
+_ATTACH_LIMIT = 256
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is not None:
+        _attached.move_to_end(name)
+        return shm
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before 3.13 attaching registers the name again with the resource
+        # tracker the workers share with us, which is harmless: our unlink()
+        # unregisters it once.
+        shm = shared_memory.SharedMemory(name=name)
+    _attached[name] = shm
+    while len(_attached) > _ATTACH_LIMIT:
+        try:
+            _attached.popitem(last=False)[1].close()
+        except BufferError:
+            pass
+    return shm
+
+
+def _warm():
+    return os.getpid()
+
+
+def _decode_into(backend, in_name, in_len, out_name, size):
+    src = _attach(in_name).buf
+    img = BACKENDS[backend][1](src[:in_len])
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != size:
+        img = img.resize(size)
+    data = img.tobytes()
+    del img
+    _attach(out_name).buf[:len(data)] = data
+    return size
+
+
+class _Slot:
+    # One input buffer for the compressed frame and one output buffer for
+    # the scaled RGB result; grown (replaced) only when a frame doesn't fit.
+    def __init__(self):
+        self.src = None
+        self.dst = None
+
+    def fit(self, in_len, out_len):
+        if self.src is None or self.src.size < in_len:
+            self._free("src")
+            self.src = shared_memory.SharedMemory(create=True, size=in_len + in_len // 4)
+        if self.dst is None or self.dst.size < out_len:
+            self._free("dst")
+            self.dst = shared_memory.SharedMemory(create=True, size=out_len)
+
+    def _free(self, attr):
+        shm = getattr(self, attr)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+            setattr(self, attr, None)
+
+    def close(self):
+        self._free("src")
+        self._free("dst")
+
+
+class DecodeChannel:
+    # Per-device handle on a DecodePool with a fixed set of slots. submit()
+    # copies the captured bytes into a free slot and returns at once, so the
+    # capture thread can fetch the next frame while this one decodes; with
+    # every slot busy the frame is dropped rather than queued. Results that
+    # finish out of order are dropped too, never shown after a newer frame.
+    def __init__(self, pool, serial, slots):
+        self.pool = pool
+        self.serial = serial
+        self.busy_drops = 0
+        self.stale_drops = 0
+        self._slots = [_Slot() for _ in range(slots)]
+        self._free = queue.Queue()
+        for slot in self._slots:
+            self._free.put(slot)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._shown = 0
+        self._closed = False
+
+    def submit(self, backend, data, size, on_done, on_error=None):
+        # on_done(img) runs on the pool's result thread with a private copy
+        # of the pixels; the slot is already free again by then.
+        if self._closed:
+            return False
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.busy_drops += 1
+            return False
+        try:
+            slot.fit(len(data), size[0] * size[1] * 3)
+            slot.src.buf[:len(data)] = data
+            with self._lock:
+                self._seq += 1
+                seq = self._seq
+            future = self.pool.executor.submit(_decode_into, backend, slot.src.name, len(data),
+                                               slot.dst.name, size)
+        except Exception:
+            self._free.put(slot)
+            raise
+        future.add_done_callback(lambda f: self._finish(f, slot, seq, on_done, on_error))
+        return True
+
+    def _finish(self, future, slot, seq, on_done, on_error):
+        img = None
+        try:
+            w, h = future.result()
+            if not self._closed:
+                img = Image.frombuffer("RGB", (w, h), slot.dst.buf, "raw", "RGB", 0, 1).copy()
+        except Exception as e:
+            if on_error and not self._closed:
+                on_error(e)
+        finally:
+            if self._closed:
+                slot.close()
+            else:
+                self._free.put(slot)
+        if img is None:
+            return
+        with self._lock:
+            stale = seq < self._shown
+            if not stale:
+                self._shown = seq
+        if stale:
+            self.stale_drops += 1
+        else:
+            on_done(img)
+
+    def close(self):
+        self._closed = True  # slots still in flight are freed by _finish
+        while True:
+            try:
+                self._free.get_nowait().close()
+            except queue.Empty:
+                break
+        self.pool._release(self)
+
+
+class DecodePool:
+    # Decode and scale of screencap frames in worker processes, off the GIL
+    # of the Tk process. Pixels never go through pickle: the compressed frame
+    # goes in and the RGB result comes out through shared memory slots owned
+    # by each device's DecodeChannel.
+    def __init__(self, workers=None, slots=2):
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = slots
+        # spawn, not fork: the parent is a threaded Tk process.
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._channels = set()
+        self._lock = threading.Lock()
+        # Start every worker now rather than on the first frames; spawning
+        # an interpreter takes far longer than a decode.
+        self.ready = [self.executor.submit(_warm) for _ in range(self.workers)]
+
+    def channel(self, serial):
+        channel = DecodeChannel(self, serial, self.slots)
+        with self._lock:
+            self._channels.add(channel)
+        return channel
+
+    def _release(self, channel):
+        with self._lock:
+            self._channels.discard(channel)
+
+    def close(self):
+        with self._lock:
+            channels, self._channels = list(self._channels), set()
+        for channel in channels:
+            channel._closed = True
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for channel in channels:
+            for slot in channel._slots:
+                slot.close()
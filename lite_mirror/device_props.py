@@ -0,0 +1,57 @@
+import re
+
+_ORIENTATION_RE = re.compile(r"(?:SurfaceOrientation:\s*|mCurrentOrientation=|ROTATION_)(\d+)")
+
+
+def parse_size(text, default=None):
+    for token in text.split():
+        if "x" in token:
+            w, _, h = token.partition("x")
+            if w.isdigit() and h.isdigit():
+                return int(w), int(h)
+    return default
+
+
+def parse_orientation(text):
+    match = _ORIENTATION_RE.search(text)
+    if not match:
+        return None
+    value = int(match.group(1))
+    return value // 90 if value >= 90 else value
+
+
+def read_orientation(client, serial):
+    # 0..3 quarter turns from the natural orientation.
+    out = client.shell(serial, "dumpsys input | grep -m1 SurfaceOrientation")
+    orientation = parse_orientation(out)
+    if orientation is None:
+        out = client.shell(serial, "dumpsys display | grep -m1 mCurrentOrientation")
+        orientation = parse_orientation(out)
+    return orientation or 0
+
+
+# Everything the mirrors need in one shell round-trip, one key=value per line.
+# The last line of `wm size`/`wm density` is the override when one is set.
+PROPS_COMMAND = ("echo size=$(wm size | tail -n1); "
+                 "echo density=$(wm density | tail -n1); "
+                 "echo model=$(getprop ro.product.model); "
+                 "echo sdk=$(getprop ro.build.version.sdk); "
+                 "echo orientation=$(dumpsys input | grep -m1 SurfaceOrientation)")
+
+
+def parse_props(text):
+    raw = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            raw[key.strip()] = value.strip()
+    props = {"size": parse_size(raw.get("size", "")), "model": raw.get("model") or None}
+    density = raw.get("density", "").split()
+    props["density"] = int(density[-1]) if density and density[-1].isdigit() else None
+    props["sdk"] = int(raw["sdk"]) if raw.get("sdk", "").isdigit() else None
+    props["orientation"] = parse_orientation(raw.get("orientation", "")) or 0
+    return props
+
+
+def read_props(client, serial):
+    return parse_props(client.shell(serial, PROPS_COMMAND))
@@ -0,0 +1,129 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .adb_client import default_client
+from .device_props import read_props
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".hopemirror", "devices.json")
+
+
+class DeviceRegistry:
+    # Live list of attached devices fed by host:track-devices pushes, plus a
+    # per-serial property cache (size, density, model, sdk, orientation) that
+    # is refreshed in the background whenever a device comes online and is
+    # kept on disk so mirrors can open without waiting on the device.
+    # Changes are queued; the Tk side drains them with poll() from after().
+    def __init__(self, client=None, cache_path=DEFAULT_CACHE, workers=4, retry_delay=1.0):
+        self.client = client or default_client()
+        self.cache_path = cache_path
+        self.retry_delay = retry_delay
+        self.states = {}
+        self.props = self._load_cache()
+        self.ready = threading.Event()  # set once the first device list arrived
+        self._events = queue.Queue()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="device-props")
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            threading.Thread(target=self._track_loop, daemon=True).start()
+        return self
+
+    def online(self):
+        with self._lock:
+            return sorted(s for s, state in self.states.items() if state == "device")
+
+    def get(self, serial):
+        with self._lock:
+            return self.props.get(serial)
+
+    def refresh_props(self, serial=None):
+        for s in ([serial] if serial else self.online()):
+            self._loader.submit(self._load_props, s)
+
+    def poll(self):
+        # True if anything changed since the last call; for the Tk thread.
+        changed = False
+        while True:
+            try:
+                self._events.get_nowait()
+            except queue.Empty:
+                return changed
+            changed = True
+
+    def _track_loop(self):
+        while True:
+            try:
+                for listing in self.client.track_devices():
+                    self._update(dict(listing))
+            except Exception as e:
+                print("Device tracking lost, retrying:", e)
+            self._update({})  # the adb server went away; nothing is attached
+            time.sleep(self.retry_delay)
+
+    def _update(self, states):
+        with self._lock:
+            old, self.states = self.states, states
+        for serial in set(old) | set(states):
+            if old.get(serial) == states.get(serial):
+                continue
+            self._events.put(serial)
+            if states.get(serial) == "device":
+                self._loader.submit(self._load_props, serial)
+        self.ready.set()
+
+    def _load_props(self, serial):
+        try:
+            props = read_props(self.client, serial)
+        except Exception as e:
+            print(f"[{serial}] Could not read device properties:", e)
+            return
+        props["updated"] = time.time()
+        with self._lock:
+            if props["size"] is None and serial in self.props:
+                props["size"] = self.props[serial].get("size")
+            self.props[serial] = props
+        self._save_cache()
+        self._events.put(serial)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        for props in data.values():
+            if props.get("size"):
+                props["size"] = tuple(props["size"])
+        return data
+
+    def _save_cache(self):
+        with self._lock:
+            text = json.dumps(self.props, indent=1, sort_keys=True)
+        try:
+            with self._save_lock:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                tmp = self.cache_path + ".tmp"
+                with open(tmp, "w") as f:
+                    f.write(text)
+                os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print("Could not save device cache:", e)
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def default_registry():
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = DeviceRegistry().start()
+        return _default_registry
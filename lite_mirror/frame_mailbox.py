@@ -0,0 +1,24 @@
+import threading
+
+
+class FrameMailbox:
+    # Single-slot hand-off between a capture thread and the Tk loop. put()
+    # overwrites any frame that has not been displayed yet (counted as
+    # dropped), take() empties the slot.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self.posted = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self.posted += 1
+
+    def take(self):
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
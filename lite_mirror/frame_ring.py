@@ -0,0 +1,93 @@
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+
+# One background thread for all disk exports so the Tk thread never waits on
+# PNG compression or video encoding.
+_exporter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-export")
+
+
+class FrameRing:
+    # The last `seconds` of displayed frames, held as references to the
+    # images the mirror already produced (no copies). Identical frames never
+    # reach the display, so each entry lasts until the next one; the newest
+    # frame older than the window is kept as the replay's opening picture.
+    # max_bytes caps memory on top of the time bound.
+    def __init__(self, seconds=10.0, max_bytes=256 * 1024 * 1024):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evicted = 0
+        self._frames = collections.deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def push(self, img, t=None):
+        t = time.monotonic() if t is None else t
+        size = img.width * img.height * len(img.getbands())
+        with self._lock:
+            self._frames.append((t, img, size))
+            self.bytes += size
+            frames = self._frames
+            while len(frames) > 1 and (self.bytes > self.max_bytes or frames[1][0] <= t - self.seconds):
+                self.bytes -= frames.popleft()[2]
+                self.evicted += 1
+
+    def latest(self):
+        with self._lock:
+            return self._frames[-1][1] if self._frames else None
+
+    def snapshot(self):
+        with self._lock:
+            return [(t, img) for t, img, _ in self._frames]
+
+
+def write_replay(frames, path, end=None, codec="h264"):
+    # Variable frame rate MP4: pts are the display times in ms, and the last
+    # picture is repeated at `end` so it is held for the right duration.
+    if not frames:
+        raise ValueError("no frames to write")
+    t0 = frames[0][0]
+    w, h = frames[-1][1].size
+    w, h = w - w % 2, h - h % 2
+    if end is not None and end > frames[-1][0]:
+        frames = frames + [(end, frames[-1][1])]
+    import av  # only needed once a replay is exported
+    with av.open(path, "w") as out:
+        stream = out.add_stream(codec, rate=30)
+        stream.width, stream.height = w, h
+        stream.pix_fmt = "yuv420p"
+        stream.codec_context.time_base = Fraction(1, 1000)
+        last_pts = -1
+        for t, img in frames:
+            pts = max(0, int((t - t0) * 1000))
+            if pts <= last_pts:
+                continue
+            last_pts = pts
+            if img.size != (w, h):
+                img = img.resize((w, h))
+            frame = av.VideoFrame.from_image(img.convert("RGB"))
+            frame.pts = pts
+            frame.time_base = Fraction(1, 1000)
+            for packet in stream.encode(frame):
+                out.mux(packet)
+        for packet in stream.encode():
+            out.mux(packet)
+    return path
+
+
+def export_replay(ring, path):
+    return _exporter.submit(write_replay, ring.snapshot(), path, time.monotonic())
+
+
+def save_image(img, path):
+    # img may also be a callable returning the image, so a frame that was
+    # only kept compressed is decoded on the export thread.
+    def save():
+        (img() if callable(img) else img).save(path)
+        return path
+    return _exporter.submit(save)
@@ -0,0 +1,128 @@
+import threading
+import time
+
+
+class GestureStreamer:
+    # Streams a pointer gesture to the device as `input motionevent`
+    # DOWN/MOVE/UP lines over the persistent shell while the pointer moves.
+    # Every `input` call is a short-lived process on the device, so at most
+    # one MOVE is in flight: newer points overwrite the pending one and it is
+    # sent once the previous MOVE has been acknowledged and move_interval has
+    # passed. Pointer-to-device latency is therefore bounded by roughly one
+    # interval plus one `input` run, and is recorded as the "touch" stage.
+    def __init__(self, shell, move_hz=60, tap_slop=10, on_send=None, metrics=None):
+        self.shell = shell
+        self.move_interval = 1.0 / move_hz
+        self.tap_slop = tap_slop
+        self.on_send = on_send
+        self.metrics = metrics
+        self.on_result = None  # called with every acknowledged ShellCommand
+        self.supported = None  # unknown until the first DOWN is acknowledged
+        self.moves_sent = 0
+        self.moves_coalesced = 0
+        self._lock = threading.Lock()
+        self._start = None
+        self._moved = False
+        self._pending = None
+        self._in_flight = False
+        self._last_move = 0.0
+        self._timer = None
+
+    @property
+    def active(self):
+        return self._start is not None
+
+    def down(self, x, y):
+        with self._lock:
+            self._start = (x, y, time.monotonic())
+            self._moved = False
+            self._pending = None
+        if self.supported is not False:
+            self._send("DOWN", x, y, self._down_done)
+
+    def move(self, x, y):
+        with self._lock:
+            if self._start is None:
+                return
+            x0, y0, _ = self._start
+            if not self._moved and abs(x - x0) <= self.tap_slop and abs(y - y0) <= self.tap_slop:
+                return
+            self._moved = True
+            if self.supported is False:
+                return
+            if self._pending is not None:
+                self.moves_coalesced += 1
+            self._pending = (x, y)
+            ready = not self._in_flight and self._timer is None
+        if ready:
+            self._flush()
+
+    def up(self, x, y):
+        with self._lock:
+            if self._start is None:
+                return
+            x0, y0, t0 = self._start
+            moved = self._moved
+            self._start = None
+            if self._pending is not None:
+                self.moves_coalesced += 1  # the UP carries the final position
+                self._pending = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self.supported is False:
+            # Older devices without motionevent: replay the gesture as one
+            # tap or swipe lasting as long as the drag did.
+            if not moved:
+                self._send_line(f"input tap {x} {y}")
+            else:
+                ms = int(min(2000, max(100, (time.monotonic() - t0) * 1000)))
+                self._send_line(f"input swipe {x0} {y0} {x} {y} {ms}")
+        else:
+            self._send("UP", x, y)
+
+    def _flush(self):
+        with self._lock:
+            self._timer = None
+            point = self._pending
+            if point is None or self._in_flight or self._start is None:
+                return
+            wait = self.move_interval - (time.monotonic() - self._last_move)
+            if wait > 0:
+                self._timer = threading.Timer(wait, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            self._pending = None
+            self._in_flight = True
+            self._last_move = time.monotonic()
+            self.moves_sent += 1
+        self._send("MOVE", point[0], point[1], self._move_done)
+
+    def _send(self, action, x, y, done=None):
+        self._send_line(f"input motionevent {action} {x} {y} 2>&1", done)
+
+    def _send_line(self, line, done=None):
+        if self.on_send:
+            self.on_send()
+        self.shell.send_line(line, callback=lambda cmd: self._acked(cmd, done))
+
+    def _acked(self, cmd, done):
+        if self.metrics and cmd.error is None:
+            self.metrics.record("touch", cmd.latency)
+        if self.on_result:
+            self.on_result(cmd)
+        if done:
+            done(cmd)
+
+    def _down_done(self, cmd):
+        if self.supported is None and cmd.error is None:
+            # motionevent prints nothing; usage text means it's unknown here.
+            self.supported = not any(cmd.output)
+            if not self.supported:
+                print(f"[{self.shell.serial}] input motionevent unsupported, using tap/swipe")
+
+    def _move_done(self, cmd):
+        with self._lock:
+            self._in_flight = False
+        self._flush()
@@ -0,0 +1,140 @@
+import os
+import queue
+import threading
+import time
+
+NAL_IDR = 5
+NAL_SPS = 7
+NAL_PPS = 8
+START_CODE = b"\x00\x00\x01"
+
+
+class SegmentRecorder:
+    # Tees the raw screenrecord bitstream (an H264Stream sink) into rotating
+    # Annex-B .h264 segments; nothing is decoded or re-encoded. A segment is
+    # closed after max_bytes or max_seconds, but the next one only starts at
+    # an SPS or IDR NAL (with the last SPS/PPS written in front) so every file
+    # plays on its own. All parsing and writing happens on the recorder's own
+    # thread; the stream only pays for a queue put per chunk.
+    def __init__(self, serial=None, directory=".", prefix="session", max_bytes=256 * 1024 * 1024,
+                 max_seconds=600, buffer_size=1 << 20):
+        self.serial = serial or "default"
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.buffer_size = buffer_size
+        self.segments = []
+        self.bytes_written = 0
+        self._queue = queue.Queue()
+        self._file = None
+        self._seg_bytes = 0
+        self._seg_started = 0.0
+        self._gen = None
+        self._buf = bytearray()
+        self._sps = None
+        self._pps = None
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def prime(self, header):
+        # Picks up SPS/PPS from the start of a stream that is already running
+        # (H264Stream.header) so a recording begun mid-stream can open at the
+        # next IDR. Call before adding the recorder as a sink.
+        for part in bytes(header or b"").split(START_CODE)[1:]:
+            kind = part[0] & 0x1F if part else 0
+            if kind == NAL_SPS:
+                self._sps = START_CODE + part
+            elif kind == NAL_PPS:
+                self._pps = START_CODE + part
+
+    def __call__(self, gen, data):
+        self._queue.put((gen, data))
+
+    def close(self, timeout=5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _write_loop(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                gen, data = item
+                if gen != self._gen:
+                    # A new screenrecord process starts its own bitstream
+                    # (possibly at a new size): finish the old one's last NAL
+                    # and begin a fresh segment at the new SPS.
+                    self._write(self._buf)
+                    self._buf = bytearray()
+                    self._close_segment()
+                    self._gen = gen
+                self._buf += data
+                self._drain()
+            self._write(self._buf)
+        except OSError as e:
+            print(f"[{self.serial}] Recording stopped:", e)
+        finally:
+            self._close_segment()
+
+    def _drain(self):
+        buf = self._buf
+        start = buf.find(START_CODE)
+        if start < 0:
+            return
+        if start > 0:
+            self._write(buf[:start])  # tail of a NAL begun in the last chunk
+        while True:
+            end = buf.find(START_CODE, start + 3)
+            if end < 0:
+                break
+            self._nal(buf[start:end])
+            start = end
+        del buf[:start]
+
+    def _nal(self, nal):
+        kind = nal[3] & 0x1F if len(nal) > 3 else 0
+        if kind == NAL_SPS:
+            self._sps = bytes(nal)
+        elif kind == NAL_PPS:
+            self._pps = bytes(nal)
+        if kind in (NAL_SPS, NAL_IDR) and self._rotation_due():
+            self._close_segment()
+            self._open_segment()
+            if kind == NAL_IDR and self._sps and self._pps:
+                self._write(self._sps)
+                self._write(self._pps)
+        self._write(nal)
+
+    def _rotation_due(self):
+        if self._file is None:
+            return True
+        return (self._seg_bytes >= self.max_bytes or
+                time.monotonic() - self._seg_started >= self.max_seconds)
+
+    def _open_segment(self):
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        name = f"{self.prefix}_{self.serial}_{stamp}_{len(self.segments):03d}.h264"
+        path = os.path.join(self.directory, name)
+        self._file = open(path, "wb", buffering=self.buffer_size)
+        self._seg_bytes = 0
+        self._seg_started = time.monotonic()
+        self.segments.append(path)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, data):
+        # Bytes before the first SPS/IDR can't be decoded and are dropped.
+        if self._file is None or not data:
+            return
+        self._file.write(data)
+        self._seg_bytes += len(data)
+        self.bytes_written += len(data)
@@ -0,0 +1,116 @@
+import threading
+import time
+from PIL import Image
+from .device_props import read_orientation
+from .h264_recorder import SegmentRecorder
+from .h264_stream import H264Stream, negotiate_stream, content_rect
+
+
+class H264Source:
+    # A screenrecord H.264 stream decoded as it arrives. screenrecord is
+    # asked for roughly the window size, renegotiated when the window is
+    # resized or the device rotates; F6 tees the bitstream to disk.
+    zoom = False
+    resizable = True  # the stream follows the window size
+    records = True
+
+    def __init__(self, mirror, backend="h264"):
+        self.mirror = mirror
+        self.backend = backend
+        self.stream = None
+        self.recorder = None
+        self.orientation = 0
+        self._rotated = False
+        self._resize_job = None
+        self._shown = None  # (img, view) last posted
+
+    def start(self):
+        m = self.mirror
+        self._shown = None  # a stopped stream's last frame may be stale
+        size, bit_rate = negotiate_stream(m.dev_w, m.dev_h, m.win_w, m.win_h)
+        self.stream = H264Stream(m.serial, on_frame=self.on_frame, client=m.client, metrics=m.metrics,
+                                 size=size, bit_rate=bit_rate).start()
+        threading.Thread(target=self.watch_orientation, daemon=True).start()
+
+    def stop(self):
+        if self.recorder is not None:
+            self.toggle_recording()
+        self.stream.stop()
+        if self._resize_job is not None:
+            self.mirror.after_cancel(self._resize_job)
+
+    def status(self):
+        return self.stream.status()
+
+    def on_frame(self, frame):
+        m = self.mirror
+        started = time.perf_counter()
+        with m.metrics.stage("resize"):
+            x, y, w, h = content_rect(m.dev_w, m.dev_h, frame.shape[1], frame.shape[0])
+            img = Image.fromarray(frame[y:y + h, x:x + w])
+            m.last_frame = img
+            if img.size != (m.win_w, m.win_h):
+                img = img.resize((m.win_w, m.win_h))
+        self._shown = img, (0, 0, m.dev_w, m.dev_h)
+        m.mailbox.put((started,) + self._shown)
+
+    def refresh(self):
+        # screenrecord only sends a frame when the screen changes, so the
+        # last one is still what the device shows.
+        if self._shown is not None:
+            self.mirror.mailbox.put((time.perf_counter(),) + self._shown)
+
+    def tick(self):
+        # Tk thread, once per refresh.
+        if self._rotated:
+            self.apply_rotation()
+
+    def resize(self, width, height):
+        m = self.mirror
+        fit = min(width / m.dev_w, height / m.dev_h)
+        m.win_w, m.win_h = max(1, int(m.dev_w * fit)), max(1, int(m.dev_h * fit))
+        if self._resize_job is not None:
+            m.after_cancel(self._resize_job)
+        self._resize_job = m.after(300, self.renegotiate)
+
+    def renegotiate(self):
+        m = self.mirror
+        self._resize_job = None
+        self.stream.reconfigure(*negotiate_stream(m.dev_w, m.dev_h, m.win_w, m.win_h))
+
+    def watch_orientation(self):
+        # `wm size` always reports the natural orientation; poll the current
+        # rotation and let the Tk side swap the axes when it changes parity.
+        m = self.mirror
+        stop = m.stop_event
+        while True:
+            try:
+                orientation = read_orientation(m.client, m.serial)
+                if orientation % 2 != self.orientation % 2:
+                    self._rotated = True
+                self.orientation = orientation
+            except Exception as e:
+                print(f"[{m.serial}] Orientation check failed:", e)
+            if stop.wait(2.0):
+                return
+
+    def apply_rotation(self):
+        m = self.mirror
+        self._rotated = False
+        m.dev_w, m.dev_h = m.dev_h, m.dev_w
+        m.win_w, m.win_h = m.win_h, m.win_w
+        m.fit_canvas()
+        self.renegotiate()
+
+    def toggle_recording(self):
+        # Tees the live screenrecord bitstream to disk; no second stream.
+        if self.recorder is None:
+            self.recorder = SegmentRecorder(self.mirror.serial, directory="recordings").start()
+            self.recorder.prime(self.stream.header)
+            self.stream.add_sink(self.recorder)
+            print("Recording to", self.recorder.directory)
+        else:
+            self.stream.remove_sink(self.recorder)
+            self.recorder.close()
+            print("Recording saved:", ", ".join(self.recorder.segments))
+            self.recorder = None
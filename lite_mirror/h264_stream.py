@@ -0,0 +1,284 @@
+import collections
+import socket
+import threading
+import time
+import av
+from .adb_client import default_client
+
+
+def negotiate_stream(dev_w, dev_h, win_w, win_h, fps=30, bits_per_pixel=0.1,
+                     min_bit_rate=1_000_000, max_bit_rate=20_000_000):
+    # Smallest encoder size (multiples of 16, which every AVC encoder takes)
+    # that still covers the window, and a bit rate sized for it. A size of
+    # None means native resolution.
+    scale = min(1.0, max(win_w / dev_w, win_h / dev_h))
+    if scale >= 1.0:
+        return None, min(max_bit_rate, int(dev_w * dev_h * fps * bits_per_pixel))
+    w = min(dev_w - dev_w % 16, -(-int(dev_w * scale) // 16) * 16)
+    h = min(dev_h - dev_h % 16, -(-int(dev_h * scale) // 16) * 16)
+    bit_rate = int(min(max_bit_rate, max(min_bit_rate, w * h * fps * bits_per_pixel)))
+    return (w, h), bit_rate
+
+
+def is_keyframe(data):
+    # True when the access unit starts a clean decode: its first picture
+    # NAL is an IDR slice, or it carries an SPS (screenrecord puts one in
+    # front of every IDR).
+    i = data.find(b"\x00\x00\x01")
+    while i != -1 and i + 3 < len(data):
+        nal = data[i + 3] & 0x1f
+        if nal in (5, 7):
+            return True
+        if nal == 1:
+            return False
+        i = data.find(b"\x00\x00\x01", i + 3)
+    return False
+
+
+def content_rect(dev_w, dev_h, vid_w, vid_h):
+    # screenrecord letterboxes the display into the video keeping its aspect
+    # ratio; returns the (x, y, w, h) of the picture inside the frame.
+    if vid_h > vid_w * dev_h // dev_w:
+        out_w, out_h = vid_w, vid_w * dev_h // dev_w
+    else:
+        out_w, out_h = vid_h * dev_w // dev_h, vid_h
+    return (vid_w - out_w) // 2, (vid_h - out_h) // 2, out_w, out_h
+
+
+class H264Stream:
+    # Decodes `screenrecord --output-format=h264` straight off the adb socket.
+    # screenrecord exits on its own after --time-limit seconds, so the next
+    # process is started `overlap` seconds early and takes over as soon as it
+    # has decoded a frame; the old one is then terminated.
+    #
+    # Reading and decoding run on separate threads with a packet queue in
+    # between. When more than max_backlog packets are waiting the decoder
+    # falls back to latency-first: it jumps to the newest queued keyframe if
+    # there is one, otherwise it still decodes (later frames reference
+    # them) but skips conversion and on_frame for all but the newest.
+    def __init__(self, serial=None, on_frame=None, time_limit=180, overlap=3.0, chunk_size=65536,
+                 client=None, metrics=None, size=None, bit_rate=None, max_backlog=3):
+        self.serial = serial
+        self.size = size
+        self.bit_rate = bit_rate
+        self.metrics = metrics
+        self.client = client or default_client()
+        self.on_frame = on_frame
+        self.time_limit = time_limit
+        self.overlap = overlap
+        self.chunk_size = chunk_size
+        self.max_backlog = max_backlog
+        self.frames = 0
+        self.backlog = 0  # packets queued behind the one being decoded
+        self.behind = 0.0  # seconds the last packet waited for the decoder
+        self.skipped = 0  # frames decoded but not shown
+        self.dropped = 0  # packets thrown away by keyframe jumps
+        self.rollovers = 0
+        self.latest = None
+        self.sinks = []
+        self.header = None  # first chunk (SPS/PPS) of the generation on screen
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._respawn = False
+        self._lock = threading.Lock()
+        self._socks = {}
+        self._active_gen = 0
+        self._latest_gen = 0
+
+    def start(self):
+        threading.Thread(target=self._supervise, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            socks = list(self._socks.values())
+        for sock in socks:
+            self._terminate(sock)
+
+    def add_sink(self, sink):
+        # sink(gen, data) gets the raw bitstream of the generation on screen,
+        # starting from its first byte; it runs on the pump thread.
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def reconfigure(self, size=None, bit_rate=None):
+        # Starts a replacement screenrecord with the new settings; the current
+        # one keeps feeding frames until the new one has decoded its first.
+        if (size, bit_rate) == (self.size, self.bit_rate):
+            return
+        self.size, self.bit_rate = size, bit_rate
+        self._respawn = True
+        self._wake.set()
+
+    def _command(self):
+        cmd = f"exec:screenrecord --output-format=h264 --time-limit {self.time_limit}"
+        if self.size:
+            cmd += f" --size {self.size[0]}x{self.size[1]}"
+        if self.bit_rate:
+            cmd += f" --bit-rate {self.bit_rate}"
+        return cmd + " -"
+
+    def _spawn(self):
+        sock = self.client.open_service(self.serial, self._command(), stream=True)
+        with self._lock:
+            self._latest_gen += 1
+            gen = self._latest_gen
+            self._socks[gen] = sock
+        threading.Thread(target=self._pump, args=(gen, sock), daemon=True).start()
+        return gen
+
+    def status(self):
+        return f"h264 behind {self.behind * 1000:4.0f} ms  queue {self.backlog}  skip {self.skipped + self.dropped}"
+
+    def _supervise(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            started = time.monotonic()
+            try:
+                self._spawn()
+            except Exception as e:
+                print(f"[{self.serial}] screenrecord start failed:", e)
+                self._stop.wait(1.0)
+                continue
+            if not self._wake.wait(max(1.0, self.time_limit - self.overlap)):
+                self.rollovers += 1
+            elif self._respawn:
+                self._respawn = False
+            elif time.monotonic() - started < 1.0:
+                self._stop.wait(1.0)  # adb is failing fast, don't spin
+
+    def _activate(self, gen):
+        with self._lock:
+            if gen <= self._active_gen:
+                return
+            self._active_gen = gen
+            stale = [g for g in self._socks if g < gen]
+            socks = [self._socks.pop(g) for g in stale]
+        for sock in socks:
+            self._terminate(sock)
+
+    def _pump(self, gen, sock):
+        # Reader: socket -> sinks and parsed packets; never waits on decode.
+        codec = av.CodecContext.create("h264", "r")
+        packets = collections.deque()
+        ready = threading.Condition()
+        first = []  # first chunk (SPS/PPS), the header once this generation shows
+        threading.Thread(target=self._decode, args=(gen, sock, packets, ready, first), daemon=True).start()
+        held = []  # bitstream kept for the sinks until this generation is shown
+        try:
+            while not self._stop.is_set() and gen >= self._active_gen:
+                chunk = sock.recv(self.chunk_size)
+                if not chunk:
+                    break
+                if not first:
+                    first.append(chunk)
+                if self.sinks:
+                    held.append(chunk)
+                    if gen == self._active_gen:
+                        for data in held:
+                            self._tee(gen, data)
+                        held = []
+                arrived = time.perf_counter()
+                parsed = [(packet, is_keyframe(bytes(packet)), arrived) for packet in codec.parse(chunk)]
+                if parsed:
+                    with ready:
+                        packets.extend(parsed)
+                        ready.notify()
+        except Exception as e:
+            if not self._stop.is_set():
+                if self.metrics:
+                    self.metrics.count("errors")
+                print(f"[{self.serial}] H.264 stream error:", e)
+        finally:
+            with ready:
+                packets.append(None)
+                ready.notify()
+            self._terminate(sock)
+            with self._lock:
+                self._socks.pop(gen, None)
+                restart = gen == self._latest_gen
+            if restart:
+                self._wake.set()
+
+    def _next_packet(self, packets, ready):
+        # The packet to decode next and whether to show its frame. With a
+        # backlog, everything before the newest queued keyframe is dropped.
+        with ready:
+            while not packets:
+                ready.wait()
+            if len(packets) > self.max_backlog + 1:
+                newest_key = None
+                for i in range(len(packets) - 1, 0, -1):
+                    if packets[i] is not None and packets[i][1]:
+                        newest_key = i
+                        break
+                if newest_key is not None:
+                    for _ in range(newest_key):
+                        packets.popleft()
+                    self.dropped += newest_key
+                    if self.metrics:
+                        self.metrics.count("h264_dropped", newest_key)
+            item = packets.popleft()
+            self.backlog = len(packets)
+        return item, self.backlog <= self.max_backlog
+
+    def _decode(self, gen, sock, packets, ready, first):
+        codec = av.CodecContext.create("h264", "r")
+        try:
+            while not self._stop.is_set() and gen >= self._active_gen:
+                item, show = self._next_packet(packets, ready)
+                if item is None:
+                    break
+                packet, _, arrived = item
+                started = time.perf_counter()
+                frames = codec.decode(packet)
+                if self.metrics and frames:
+                    self.metrics.record("decode", time.perf_counter() - started)
+                self.behind = time.perf_counter() - arrived
+                for frame in frames:
+                    if gen > self._active_gen:
+                        self._activate(gen)
+                        self.header = first[0]
+                    if gen != self._active_gen:
+                        continue
+                    if show:
+                        self._emit(frame)
+                    else:
+                        self.skipped += 1
+                        if self.metrics:
+                            self.metrics.count("h264_skipped")
+        except Exception as e:
+            if not self._stop.is_set():
+                if self.metrics:
+                    self.metrics.count("errors")
+                print(f"[{self.serial}] H.264 decode error:", e)
+        finally:
+            self._terminate(sock)  # a dead decoder ends the reader too
+
+    def _tee(self, gen, data):
+        for sink in list(self.sinks):
+            sink(gen, data)
+
+    def _emit(self, frame):
+        started = time.perf_counter()
+        arr = frame.to_ndarray(format="rgb24")
+        if self.metrics:
+            self.metrics.record("convert", time.perf_counter() - started)
+        self.frames += 1
+        self.latest = arr
+        if self.on_frame:
+            self.on_frame(arr)
+
+    @staticmethod
+    def _terminate(sock):
+        # adbd kills screenrecord when its service socket goes away.
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
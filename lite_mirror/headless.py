@@ -0,0 +1,79 @@
+import threading
+from .adb_client import default_client
+from .device_props import parse_size
+from .frame_mailbox import FrameMailbox
+from .metrics import DeviceMetrics
+from .rate_control import FrameRateController
+from .sources import create_source
+
+
+class FrameCallback:
+    # Mailbox stand-in that hands every frame straight to fn(item) on the
+    # capture thread.
+    dropped = 0
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def put(self, item):
+        self.fn(item)
+
+
+class HeadlessMirror:
+    # What a source needs from a Mirror, without a window, so the wall, the
+    # MJPEG server and the benchmarks run the same registered sources. The
+    # picture is `scale` times the device size, or fitted inside `fit`
+    # (w, h). Frames land in `mailbox`, or go to on_frame((started, img,
+    # view)) on the capture thread. A thread stands in for the Tk loop's
+    # tick() while started.
+    tick_s = 0.25
+
+    def __init__(self, serial, backend="raw", client=None, pool=None, registry=None, scale=1.0, fit=None,
+                 target_fps=12, decoder=None, on_frame=None, metrics=None):
+        self.serial = serial
+        self.client = client or default_client()
+        self.pool = pool
+        self.registry = registry
+        self.scale = scale
+        self.fit = fit
+        self.decoder = decoder
+        self.rate = FrameRateController(target_fps)
+        self.metrics = metrics or DeviceMetrics(serial)
+        self.mailbox = FrameCallback(on_frame) if on_frame else FrameMailbox()
+        self.stop_event = threading.Event()
+        self.roi = None
+        self.last_frame = None
+        self.dev_w = self.dev_h = self.win_w = self.win_h = None
+        self.source = create_source(backend, self)
+
+    def start(self):
+        # Blocks on `wm size` when the size isn't cached; keep it off a Tk
+        # thread.
+        if self.dev_w is None:
+            self.set_device_size(*self.get_device_size())
+        self.stop_event = threading.Event()
+        self.source.start()
+        threading.Thread(target=self._tick_loop, args=(self.stop_event,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.source.stop()
+
+    def _tick_loop(self, stop):
+        while not stop.wait(self.tick_s):
+            self.source.tick()
+
+    def get_device_size(self):
+        props = self.registry.get(self.serial) if self.registry else None
+        if props and props.get("size"):
+            return tuple(props["size"])
+        return parse_size(self.client.shell(self.serial, "wm size"), (1080, 1920))
+
+    def set_device_size(self, w, h):
+        self.dev_w, self.dev_h = w, h
+        scale = min(self.fit[0] / w, self.fit[1] / h) if self.fit else self.scale
+        self.win_w, self.win_h = max(1, int(w * scale)), max(1, int(h * scale))
+
+    def fit_canvas(self):
+        pass  # no window to resize
@@ -0,0 +1,117 @@
+import collections
+import threading
+import time
+import numpy as np
+from .metrics import RollingHistogram
+
+
+class _Pending:
+    __slots__ = ("kind", "box", "sent_at", "baseline")
+
+    def __init__(self, kind, box, sent_at, baseline):
+        self.kind = kind
+        self.box = box
+        self.sent_at = sent_at
+        self.baseline = baseline
+
+
+class LatencyProbe:
+    # Input-to-visible latency. mark() is called when a tap, drag or key is
+    # dispatched; observe() with every frame as it becomes visible. The first
+    # frame captured after the dispatch whose pixels differ from the last
+    # earlier frame inside the affected box (a square around a tap, the whole
+    # screen otherwise) ends the probe. Times are perf_counter seconds.
+    # Whole-screen probes only mean something on an otherwise still screen.
+    def __init__(self, metrics=None, radius=0.06, level=24, min_changed=0.02, timeout=3.0, window=256):
+        self.metrics = metrics
+        self.radius = radius
+        self.level = level
+        self.min_changed = min_changed
+        self.timeout = timeout
+        self.window = window
+        self.latency = {}  # (kind, backend) -> RollingHistogram of ms
+        self.missed = collections.Counter()
+        self._pending = []
+        self._last = None
+        self._down = None
+        self._lock = threading.Lock()
+
+    def mark(self, kind, fx=None, fy=None, sent_at=None):
+        if fx is None:
+            box = (0.0, 0.0, 1.0, 1.0)
+        else:
+            r = self.radius
+            box = (max(fx - r, 0.0), max(fy - r, 0.0), min(fx + r, 1.0), min(fy + r, 1.0))
+        with self._lock:
+            self._pending.append(_Pending(kind, box, sent_at or time.perf_counter(), self._last))
+
+    def touch(self, action, fx, fy, slop=0.02):
+        # Gesture hook: a press is a tap probe at that spot, a release that
+        # moved further than slop (fraction of the picture) a whole-screen
+        # drag probe.
+        if action == "down":
+            self._down = (fx, fy)
+            self.mark("tap", fx, fy)
+        elif action == "up" and self._down is not None:
+            if max(abs(fx - self._down[0]), abs(fy - self._down[1])) > slop:
+                self.mark("drag")
+            self._down = None
+
+    def observe(self, img, captured_at, backend="", shown_at=None):
+        # img is a PIL image or an HxWx3 array at any scale.
+        with self._lock:
+            self._last = img
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+        shown_at = shown_at or time.perf_counter()
+        keep = []
+        for p in pending:
+            if shown_at - p.sent_at > self.timeout:
+                self.missed[p.kind, backend] += 1
+            elif captured_at < p.sent_at or p.baseline is None:
+                # captured before the input went out: a better baseline
+                p.baseline = img
+                keep.append(p)
+            elif self._changed(p.baseline, img, p.box):
+                self._record(p.kind, backend, shown_at - p.sent_at)
+            else:
+                keep.append(p)
+        with self._lock:
+            self._pending = keep + self._pending
+
+    def _changed(self, before, after, box):
+        a, b = self._crop(before, box), self._crop(after, box)
+        if a.shape != b.shape:
+            return True  # rotated or resized: certainly visible
+        diff = np.abs(a.astype(np.int16) - b.astype(np.int16)).max(axis=-1)
+        return np.count_nonzero(diff > self.level) >= self.min_changed * diff.size
+
+    @staticmethod
+    def _crop(img, box):
+        arr = np.asarray(img)
+        h, w = arr.shape[:2]
+        x0, y0, x1, y1 = int(box[0] * w), int(box[1] * h), max(int(box[2] * w), 1), max(int(box[3] * h), 1)
+        # about 64k pixels per comparison whatever the frame size
+        step = max(1, int(((x1 - x0) * (y1 - y0) / 65536) ** 0.5))
+        return arr[y0:y1:step, x0:x1:step, :3]
+
+    def _record(self, kind, backend, seconds):
+        key = (kind, backend)
+        hist = self.latency.get(key)
+        if hist is None:
+            hist = self.latency.setdefault(key, RollingHistogram(self.window))
+        hist.add(seconds * 1000)
+        if self.metrics is not None:
+            self.metrics.record("photon", seconds)
+
+    def report(self):
+        # {"tap/raw": {count, mean, p50, p95, max, missed}, ...}
+        out = {}
+        for (kind, backend), hist in sorted(self.latency.items()):
+            s = hist.summary()
+            s["missed"] = self.missed[kind, backend]
+            out[f"{kind}/{backend}" if backend else kind] = s
+        for (kind, backend), n in self.missed.items():
+            out.setdefault(f"{kind}/{backend}" if backend else kind, {"count": 0, "missed": n})
+        return out
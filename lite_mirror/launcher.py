@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+from .broadcast import BroadcastGroup
+from .capture_pool import CapturePool
+from .device_registry import default_registry
+from .sources import source_names
+
+# Interpreter start to a populated device list, measured by --startup-check.
+# Mirrors, the wall and the decode pool are imported when first opened, so
+# none of HEAVY_MODULES may be loaded by then.
+STARTUP_BUDGET_MS = 250
+HEAVY_MODULES = ("numpy", "PIL.Image", "PIL.ImageTk", "av", "cv2", "pyperclip")
+
+
+class DeviceSelector(tk.Tk):
+    def __init__(self, backend="raw", scale=0.35, toolbar=True):
+        super().__init__()
+        self.title("HopeMirror Launcher")
+        self.configure(bg="#202030")
+        self.geometry("360x470")
+        self.resizable(False, False)
+        self.scale = scale
+        self.toolbar = toolbar
+
+        tk.Label(self, text="Connected Devices", font=("Helvetica", 13), bg="#202030", fg="white").pack(pady=10)
+        self.device_list = tk.Listbox(self, selectmode="extended", height=12, bg="#303050", fg="white")
+        self.device_list.pack(fill="both", expand=True, padx=15)
+
+        btn_frame = tk.Frame(self, bg="#202030")
+        btn_frame.pack(pady=15)
+        ttk.Button(btn_frame, text="🔄 Refresh", command=self.reload).pack(side="left", padx=4)
+        ttk.Button(btn_frame, text="▶️ Stream", command=self.stream_selected).pack(side="left", padx=4)
+        ttk.Button(btn_frame, text="🧱 Wall", command=self.wall_selected).pack(side="left", padx=4)
+        ttk.Button(btn_frame, text="🔗 Group", command=self.group_selected).pack(side="left", padx=4)
+
+        options = tk.Frame(self, bg="#202030")
+        options.pack()
+        tk.Label(options, text="Backend", bg="#202030", fg="white").pack(side="left")
+        self.backend = tk.StringVar(value=backend)
+        ttk.Combobox(options, textvariable=self.backend, values=source_names(), width=6,
+                     state="readonly").pack(side="left", padx=4)
+        self.offload = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options, text="Decode in worker processes", variable=self.offload).pack(side="left")
+
+        self.stats_label = tk.Label(self, text="", justify="left", font=("Courier", 9), bg="#202030", fg="white")
+        self.stats_label.pack(fill="x", padx=15, pady=(0, 10))
+
+        self.registry = default_registry()
+        self.serials = []
+        self.capture_pool = CapturePool(max_in_flight=4)
+        self.decode_pool = None
+        self.groups = []
+        self.refresh()
+        self.poll_registry()
+        self.update_stats()
+
+    def refresh(self):
+        selected = {self.serials[i] for i in self.device_list.curselection()}
+        self.serials = self.registry.online()
+        self.device_list.delete(0, tk.END)
+        for i, serial in enumerate(self.serials):
+            props = self.registry.get(serial) or {}
+            model = props.get("model")
+            self.device_list.insert(tk.END, f"{serial}  {model}" if model else serial)
+            if serial in selected:
+                self.device_list.selection_set(i)
+
+    def reload(self):
+        self.registry.refresh_props()
+        self.refresh()
+
+    def poll_registry(self):
+        # track-devices pushes plug/unplug events; no adb calls on this thread.
+        if self.registry.poll():
+            self.refresh()
+        self.after(250, self.poll_registry)
+
+    def get_decode_pool(self):
+        # Started on first use; one worker process per core. Only the
+        # screencap backends decode whole frames.
+        if not self.offload.get() or self.backend.get() == "h264":
+            return None
+        if self.decode_pool is None:
+            from .decode_pool import DecodePool
+            self.decode_pool = DecodePool()
+        return self.decode_pool
+
+    def selected(self):
+        selection = self.device_list.curselection()
+        if not selection:
+            messagebox.showinfo("No Selection", "Please select at least one device.")
+        return [self.serials[i] for i in selection]
+
+    def open_mirror(self, serial, group=None):
+        from .mirror import Mirror
+        return Mirror(serial, scale=self.scale, backend=self.backend.get(), pool=self.capture_pool,
+                      registry=self.registry, decode_pool=self.get_decode_pool(), group=group,
+                      toolbar=self.toolbar)
+
+    def stream_selected(self):
+        for serial in self.selected():
+            self.open_mirror(serial)
+
+    def wall_selected(self):
+        # One composited window instead of a Toplevel per phone.
+        serials = self.selected()
+        if serials:
+            from .wall import WallView
+            WallView(serials, pool=self.capture_pool, registry=self.registry, backend=self.backend.get())
+
+    def group_selected(self):
+        # The first selected device leads: its input is replayed on all.
+        serials = self.selected()
+        if not serials:
+            return
+        group = BroadcastGroup()
+        self.groups.append(group)
+        for serial in serials:
+            self.open_mirror(serial, group)
+
+    def update_stats(self):
+        lines = [
+            f"{serial[:14]:<14} {st['fps']:5.1f} fps {st['capture_ms']:6.1f} ms {st['errors']} err"
+            for serial, st in sorted(self.capture_pool.stats().items())
+        ]
+        self.groups = [g for g in self.groups if g.members]
+        for group in self.groups:
+            lines.append(f"group led by {group.leader.serial}:")
+            lines.append(group.report())
+        self.stats_label.config(text="\n".join(lines))
+        self.after(1000, self.update_stats)
+
+
+def open_single(serial, backend, scale, toolbar):
+    # One mirror window and nothing else; closing it quits. No serial means
+    # the only attached device, like adb without -s.
+    registry = default_registry()
+    if not serial:
+        registry.ready.wait(2.0)
+        online = registry.online()
+        if len(online) != 1:
+            raise SystemExit(f"--open needs a serial: {len(online)} devices attached")
+        serial = online[0]
+    from .mirror import Mirror
+    root = tk.Tk()
+    root.withdraw()
+    mirror = Mirror(serial, scale=scale, backend=backend, registry=registry, toolbar=toolbar)
+    root.wait_window(mirror)
+    root.destroy()
+
+
+# Runs in a fresh interpreter so nothing is imported yet.
+_STARTUP_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from lite_mirror import launcher
+t1 = time.perf_counter()
+registry = launcher.default_registry()
+registry.ready.wait(2.0)
+t2 = time.perf_counter()
+window_ms = None
+try:
+    launcher.DeviceSelector().update()
+    window_ms = (time.perf_counter() - t2) * 1000
+except launcher.tk.TclError:
+    pass  # no display
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "devices_ms": (t2 - t1) * 1000,
+                  "window_ms": window_ms, "devices": len(registry.online()),
+                  "heavy": [m for m in launcher.HEAVY_MODULES if m in sys.modules]}))
+"""
+
+
+def measure_startup():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE], cwd=root, capture_output=True,
+                         text=True, check=True).stdout
+    result = json.loads(out.splitlines()[-1])
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def startup_check(budget_ms=STARTUP_BUDGET_MS):
+    r = measure_startup()
+    window = f"{r['window_ms']:.0f} ms" if r["window_ms"] is not None else "n/a (no display)"
+    print(f"imports {r['import_ms']:.0f} ms, device list {r['devices_ms']:.0f} ms ({r['devices']} devices), "
+          f"window {window}, total {r['total_ms']:.0f} ms of {budget_ms} ms")
+    if r["heavy"]:
+        print("loaded at startup:", ", ".join(r["heavy"]))
+    return 0 if r["total_ms"] <= budget_ms and not r["heavy"] else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m lite_mirror", description="Mirror Android devices over adb")
+    parser.add_argument("--open", nargs="?", const="", metavar="SERIAL",
+                        help="open one mirror instead of the launcher (the only device if no serial)")
+    parser.add_argument("--backend", choices=source_names(), default="raw")
+    parser.add_argument("--scale", type=float, default=0.35)
+    parser.add_argument("--no-toolbar", dest="toolbar", action="store_false")
+    parser.add_argument("--startup-check", action="store_true",
+                        help=f"time a cold launcher start against {STARTUP_BUDGET_MS} ms and exit")
+    args = parser.parse_args(argv)
+    if args.startup_check:
+        sys.exit(startup_check())
+    if args.open is not None:
+        open_single(args.open, args.backend, args.scale, args.toolbar)
+    else:
+        DeviceSelector(args.backend, args.scale, args.toolbar).mainloop()
+
+
+if __name__ == "__main__":
+    main()
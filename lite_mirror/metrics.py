@@ -0,0 +1,126 @@
+import collections
+import threading
+import time
+
+
+class RollingHistogram:
+    def __init__(self, size=256):
+        self.samples = collections.deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "mean": sum(ordered) / n,
+            "p50": ordered[n // 2],
+            "p95": ordered[min(n - 1, int(n * 0.95))],
+            "max": ordered[-1],
+        }
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+
+
+class DeviceMetrics:
+    # Per-device stage timings (ms, rolling histograms), counters and a
+    # displayed-frame rate. Hot-path cost is a perf_counter pair and a deque
+    # append; summaries are only computed for the HUD and exports.
+    def __init__(self, serial, window=256):
+        self.serial = serial or "default"
+        self.window = window
+        self.stages = {}
+        self.counters = collections.Counter()
+        self._frames = collections.deque(maxlen=120)
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds):
+        hist = self.stages.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.stages.setdefault(name, RollingHistogram(self.window))
+        hist.add(seconds * 1000)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def frame_displayed(self):
+        self._frames.append(time.monotonic())
+        self.counters["frames"] += 1
+
+    def fps(self):
+        frames = [t for t in self._frames if time.monotonic() - t <= 2.0]
+        if len(frames) < 2:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0])
+
+    def summaries(self):
+        with self._lock:
+            stages = list(self.stages.items())
+        return {name: s for name, s in ((n, h.summary()) for n, h in stages) if s}
+
+    def hud_text(self, dropped=0):
+        lines = [f"{self.fps():5.1f} fps  drop {dropped}  err {self.counters['errors']}"]
+        for name, s in self.summaries().items():
+            lines.append(f"{name:<8} {s['p50']:6.1f} ms  p95 {s['p95']:6.1f}")
+        return "\n".join(lines)
+
+    def rows(self, dropped=0):
+        rows = [("fps", round(self.fps(), 2)), ("dropped_frames", dropped)]
+        rows += sorted(self.counters.items())
+        for name, s in self.summaries().items():
+            rows.append((f"{name}_count", s["count"]))
+            for key in ("mean", "p50", "p95", "max"):
+                rows.append((f"{name}_{key}_ms", round(s[key], 3)))
+        return rows
+
+    def to_csv(self, dropped=0):
+        lines = ["serial,metric,value"]
+        lines += [f"{self.serial},{name},{value}" for name, value in self.rows(dropped)]
+        return "\n".join(lines) + "\n"
+
+    def to_prometheus(self, dropped=0):
+        label = f'serial="{self.serial}"'
+        lines = [
+            "# TYPE hopemirror_fps gauge",
+            f"hopemirror_fps{{{label}}} {self.fps():.2f}",
+            "# TYPE hopemirror_dropped_frames_total counter",
+            f"hopemirror_dropped_frames_total{{{label}}} {dropped}",
+        ]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE hopemirror_{name}_total counter")
+            lines.append(f"hopemirror_{name}_total{{{label}}} {value}")
+        lines.append("# TYPE hopemirror_stage_ms summary")
+        for name, s in self.summaries().items():
+            stage = f'{label},stage="{name}"'
+            for q, key in (("0.5", "p50"), ("0.95", "p95"), ("1", "max")):
+                lines.append(f'hopemirror_stage_ms{{{stage},quantile="{q}"}} {s[key]:.3f}')
+            lines.append(f"hopemirror_stage_ms_count{{{stage}}} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, dropped=0):
+        text = self.to_csv(dropped) if path.endswith(".csv") else self.to_prometheus(dropped)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
@@ -0,0 +1,343 @@
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+from .adb_client import default_client
+from .adb_shell import get_session, release_session
+from .capture import clamp_box
+from .device_props import parse_size
+from .frame_mailbox import FrameMailbox
+from .frame_ring import FrameRing, export_replay, save_image
+from .gestures import GestureStreamer
+from .latency_probe import LatencyProbe
+from .metrics import DeviceMetrics
+from .rate_control import FrameRateController
+from .signal_monitor import SignalView
+from .sources import create_source
+from .text_inject import TextInjector
+from .tile_blit import TileBlitter
+
+
+class Mirror(tk.Toplevel):
+    # One device in one window, whatever the capture backend. The source
+    # (see sources.py) produces frames into the mailbox from its own
+    # threads; everything here runs on the Tk thread: display, HUD, input,
+    # zoom, screenshots and replays.
+    refresh_ms = 16
+
+    def __init__(self, serial, scale=0.5, backend="raw", target_fps=12, pool=None, registry=None,
+                 decode_pool=None, group=None, toolbar=True):
+        super().__init__()
+        self.serial = serial
+        self.scale = scale
+        self.stop_event = threading.Event()
+        self.rate = FrameRateController(target_fps)
+        self.pool = pool
+        self.registry = registry
+        self.decoder = decode_pool.channel(serial) if decode_pool else None
+        self.group = group
+        self.client = default_client()
+        self.metrics = DeviceMetrics(serial)
+        self.probe = LatencyProbe(self.metrics)
+        self.hud_id = None
+        self.title(f"HopeMirror – {serial}")
+        self.configure(bg="#202030")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.shell = get_session(serial)
+        self.text = TextInjector(self.shell)
+        self.source = create_source(backend, self)
+
+        self.dev_w, self.dev_h = self.get_device_size()
+        self.win_w = int(self.dev_w * scale)
+        self.win_h = int(self.dev_h * scale)
+        self._canvas_size = (self.win_w, self.win_h)
+        # Zoom: roi is the device rectangle to capture (None = whole screen),
+        # view the one on screen now; map_coords goes through view.
+        self.roi = None
+        self.view = (0, 0, self.dev_w, self.dev_h)
+        self._select = None
+
+        if toolbar:
+            self.build_toolbar()
+
+        self.canvas = tk.Canvas(self, width=self.win_w, height=self.win_h, bg="#101020", bd=0, highlightthickness=0)
+        if self.source.resizable:
+            self.canvas.pack(fill="both", expand=True)
+            self.canvas.bind("<Configure>", lambda ev: self.source.resize(ev.width, ev.height))
+        else:
+            self.canvas.pack()
+        self.img_id = self.canvas.create_image(0, 0, anchor="nw", image=None)
+        self.blitter = TileBlitter(self.canvas, self.img_id)
+        self.mailbox = FrameMailbox()
+        self.ring = FrameRing()
+        self.last_frame = None
+        self.gesture = GestureStreamer(self.shell, on_send=self.rate.poke, metrics=self.metrics)
+        if group is not None:
+            group.add(self)
+            if group.leader is self:
+                self.title(f"HopeMirror – {serial} (group leader)")
+
+        self.canvas.bind("<ButtonPress-1>", self.on_press)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        if self.source.zoom:
+            self.canvas.bind("<ButtonPress-3>", self.select_start)
+            self.canvas.bind("<B3-Motion>", self.select_drag)
+            self.canvas.bind("<ButtonRelease-3>", self.select_end)
+            self.bind("<Escape>", lambda ev: self.set_roi(None))
+        self.bind("<F2>", self.toggle_hud)
+        self.bind("<F3>", self.export_metrics)
+        self.bind("<F4>", self.take_screenshot)
+        self.bind("<F5>", self.instant_replay)
+        if self.source.records:
+            self.bind("<F6>", lambda ev: self.source.toggle_recording())
+        if pool is not None:
+            self.bind("<FocusIn>", lambda ev: pool.set_focus(serial))
+
+        self.source.start()
+        self.refresh_display()
+
+    def build_toolbar(self):
+        toolbar = tk.Frame(self, bg="#202030")
+        toolbar.pack(side="top", fill="x", padx=5, pady=3)
+
+        buttons = [
+            ("🔊 Vol +", self.volume_up),
+            ("🔉 Vol -", self.volume_down),
+            ("🏠 Home", self.send_home),
+            ("🔙 Back", self.send_back),
+            ("📲 Recents", self.send_recents),
+            ("📸 Screenshot", self.take_screenshot),
+            ("⏪ Replay", self.instant_replay),
+            ("🔓 Unlock", self.unlock_screen),
+            ("✈️ On", self.airplane_on),
+            ("🛬 Off", self.airplane_off),
+            ("📋 Paste", self.paste_clipboard),
+            ("⌨ Text", self.prompt_send_text),
+            ("📶 RSRP", self.show_signal_info),
+            ("📊 HUD", self.toggle_hud)
+        ]
+
+        for label, cmd in buttons:
+            ttk.Button(toolbar, text=label, command=cmd).pack(side="left", padx=2)
+
+    def get_device_size(self):
+        # The launcher's registry usually has the size cached already; the
+        # first frame (or the orientation watch) corrects it if the device
+        # has since been rotated.
+        props = self.registry.get(self.serial) if self.registry else None
+        if props and props.get("size"):
+            return tuple(props["size"])
+        return parse_size(self.client.shell(self.serial, "wm size"), (1080, 1920))
+
+    def set_device_size(self, w, h):
+        self.dev_w, self.dev_h = w, h
+        self.win_w, self.win_h = int(w * self.scale), int(h * self.scale)
+
+    def fit_canvas(self):
+        self.canvas.config(width=self.win_w, height=self.win_h)
+        self.geometry("")
+
+    def refresh_display(self):
+        self.source.tick()
+        item = self.mailbox.take()
+        if item is not None:
+            started, img, self.view = item
+            if img.size != self._canvas_size:
+                self._canvas_size = img.size
+                if not self.source.resizable:
+                    self.canvas.config(width=img.width, height=img.height)
+            with self.metrics.stage("blit"):
+                self.blitter.show(img)
+            self.probe.observe(img, started, self.source.backend)
+            self.ring.push(img)
+            self.metrics.record("latency", time.perf_counter() - started)
+            self.metrics.frame_displayed()
+        self._refresh_job = self.after(self.refresh_ms, self.refresh_display)
+
+    def toggle_hud(self, ev=None):
+        if self.hud_id is None:
+            self.hud_id = self.canvas.create_text(6, 6, anchor="nw", fill="#40ff80", font=("Courier", 9))
+            self.update_hud()
+        else:
+            self.after_cancel(self._hud_job)
+            self.canvas.delete(self.hud_id)
+            self.hud_id = None
+
+    def update_hud(self):
+        text = self.metrics.hud_text(self.mailbox.dropped)
+        status = self.source.status()
+        if status:
+            text += "\n" + status
+        self.canvas.itemconfig(self.hud_id, text=text)
+        self._hud_job = self.after(500, self.update_hud)
+
+    def export_metrics(self, ev=None):
+        name = f"metrics_{self.metrics.serial}"
+        self.metrics.export(name + ".csv", self.mailbox.dropped)
+        self.metrics.export(name + ".prom", self.mailbox.dropped)
+        print(f"[{self.metrics.serial}] Metrics written to {name}.csv / {name}.prom")
+
+    def leads_group(self):
+        return self.group is not None and self.group.leader is self
+
+    def send_input(self, *args):
+        if args[:2] == ("input", "keyevent"):
+            self.probe.mark("key")
+        if self.leads_group():
+            self.group.send(*args)
+            return
+        self.rate.poke()
+        self.shell.send(*args)
+
+    def map_coords(self, x, y):
+        vx, vy, vw, vh = self.view
+        cw, ch = self._canvas_size
+        return int(vx + x * vw / cw), int(vy + y * vh / ch)
+
+    def select_start(self, ev):
+        self._select = (ev.x, ev.y, self.canvas.create_rectangle(ev.x, ev.y, ev.x, ev.y, outline="#40ff80"))
+
+    def select_drag(self, ev):
+        if self._select is not None:
+            x0, y0, rect = self._select
+            self.canvas.coords(rect, x0, y0, ev.x, ev.y)
+
+    def select_end(self, ev):
+        # Right-drag zooms into the rectangle; a right-click without a drag
+        # (or Escape) goes back to the whole screen.
+        if self._select is None:
+            return
+        x0, y0, rect = self._select
+        self._select = None
+        self.canvas.delete(rect)
+        if abs(ev.x - x0) < 8 or abs(ev.y - y0) < 8:
+            self.set_roi(None)
+            return
+        (ax, ay), (bx, by) = self.map_coords(x0, y0), self.map_coords(ev.x, ev.y)
+        self.set_roi((min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)))
+
+    def set_roi(self, roi):
+        # Clamped here so capture and map_coords agree on the rectangle
+        # when the drag ended off the canvas.
+        self.roi = clamp_box(roi, self.dev_w, self.dev_h) if roi is not None else None
+        self.rate.poke()
+
+    def on_press(self, ev):
+        self.touch("down", ev)
+
+    def on_drag(self, ev):
+        self.touch("move", ev)
+
+    def on_release(self, ev):
+        self.touch("up", ev)
+
+    def touch(self, action, ev):
+        cw, ch = self._canvas_size
+        self.probe.touch(action, ev.x / cw, ev.y / ch)
+        if self.leads_group():
+            x, y = self.map_coords(ev.x, ev.y)
+            self.group.touch(action, x / self.dev_w, y / self.dev_h)
+        else:
+            getattr(self.gesture, action)(*self.map_coords(ev.x, ev.y))
+
+    def on_close(self):
+        self.stop_event.set()
+        self.rate.poke()
+        self.source.stop()
+        self.after_cancel(self._refresh_job)
+        if self.decoder is not None:
+            self.decoder.close()
+        if self.hud_id is not None:
+            self.after_cancel(self._hud_job)
+        if self.group is not None:
+            self.group.remove(self)
+        release_session(self.serial)
+        self.destroy()
+
+    def volume_up(self): self.send_input("input", "keyevent", 24)
+    def volume_down(self): self.send_input("input", "keyevent", 25)
+    def send_back(self): self.send_input("input", "keyevent", 4)
+    def send_home(self): self.send_input("input", "keyevent", 3)
+    def send_recents(self): self.send_input("input", "keyevent", 187)
+
+    def unlock_screen(self):
+        for code in [26, 82, 82]:
+            self.send_input("input", "keyevent", code)
+
+    def airplane_on(self):
+        self.send_input("settings", "put", "global", "airplane_mode_on", 1)
+        self.send_input("am", "broadcast", "-a", "android.intent.action.AIRPLANE_MODE", "--ez", "state", "true")
+
+    def airplane_off(self):
+        self.send_input("settings", "put", "global", "airplane_mode_on", 0)
+        self.send_input("am", "broadcast", "-a", "android.intent.action.AIRPLANE_MODE", "--ez", "state", "false")
+
+    def read_clipboard(self):
+        # pyperclip is optional and only loaded on the first paste; Tk's own
+        # clipboard covers most desktops without it.
+        try:
+            import pyperclip
+        except ImportError:
+            try:
+                return self.clipboard_get()
+            except tk.TclError:
+                return ""
+        return pyperclip.paste()
+
+    def type_text(self, text):
+        if not text:
+            return
+        if self.leads_group():
+            self.group.type_text(text)
+            return
+        self.rate.poke()
+        self.text.inject(text)
+
+    def paste_clipboard(self):
+        self.type_text(self.read_clipboard())
+
+    def prompt_send_text(self):
+        top = tk.Toplevel(self)
+        top.title("Send Text to Device")
+        top.geometry("300x120")
+        tk.Label(top, text="Enter text:").pack(pady=5)
+        entry = tk.Entry(top)
+        entry.pack(pady=5)
+
+        def send():
+            self.type_text(entry.get())
+            top.destroy()
+
+        entry.bind("<Return>", lambda ev: send())
+        ttk.Button(top, text="Send", command=send).pack()
+        entry.focus_set()
+
+    def show_signal_info(self):
+        # Polled in the background by the shared SignalMonitor.
+        SignalView(self.serial)
+
+    def take_screenshot(self, ev=None):
+        # Dumps the last full-resolution frame; no device round-trip.
+        if self.last_frame is None:
+            messagebox.showerror("Screenshot Error", "No frame received yet")
+            return
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"screenshot_{self.serial}_{timestamp}.png"
+        self.watch_export(save_image(self.last_frame, filename), "Screenshot")
+
+    def instant_replay(self, ev=None):
+        if not len(self.ring):
+            messagebox.showerror("Replay Error", "No frames received yet")
+            return
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"replay_{self.serial}_{timestamp}.mp4"
+        self.watch_export(export_replay(self.ring, filename), "Replay")
+
+    def watch_export(self, future, what):
+        if not future.done():
+            self.after(100, self.watch_export, future, what)
+        elif future.exception() is not None:
+            messagebox.showerror(f"{what} Error", str(future.exception()))
+        else:
+            messagebox.showinfo(f"{what} Saved", f"Saved to {future.result()}")
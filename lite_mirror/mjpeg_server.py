@@ -0,0 +1,220 @@
+import argparse
+import io
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .adb_client import default_client
+from .capture_pool import CapturePool
+from .headless import HeadlessMirror
+from .sources import source_names
+
+BOUNDARY = "hopemirrorframe"
+
+
+class DeviceFeed:
+    # One capture loop per serial however many browsers watch it: any
+    # registered source, run headless. A frame is JPEG-encoded only when it
+    # changed, and every viewer gets the same encoded bytes. Only the newest
+    # frame is kept: a viewer that is still sending an older one simply
+    # skips to it. Capture runs only while at least one viewer is attached.
+    def __init__(self, serial, pool, client=None, backend="raw", fps=10, quality=75, scale=1.0):
+        self.serial = serial
+        self.quality = quality
+        self.mirror = HeadlessMirror(serial, backend, client, pool=pool, scale=scale, target_fps=fps,
+                                     on_frame=self.on_frame)
+        self.seq = 0
+        self.jpeg = None
+        self.captured_at = 0.0  # perf_counter when the device showed what jpeg shows
+        self.encoded = 0
+        self.viewers = 0
+        self.skipped = 0  # frames viewers never got because they were busy
+        self._cond = threading.Condition()
+        self._switch = threading.Lock()  # viewers and start/stop
+
+    @property
+    def unchanged(self):
+        return self.mirror.metrics.counters["identical"]
+
+    def attach(self):
+        with self._switch:
+            if self.viewers == 0:
+                self.mirror.start()
+            self.viewers += 1
+        self.mirror.rate.poke()
+
+    def detach(self):
+        with self._switch:
+            self.viewers -= 1
+            if self.viewers == 0:
+                self.mirror.stop()
+
+    def on_frame(self, item):
+        started, img, view = item
+        out = io.BytesIO()
+        img.convert("RGB").save(out, "JPEG", quality=self.quality)
+        with self._cond:
+            self.seq += 1
+            self.jpeg = out.getvalue()
+            self.captured_at = started
+            self.encoded += 1
+            self._cond.notify_all()
+
+    def snapshot(self, timeout=10.0):
+        # A jpeg of the screen as captured after this call, or None. The
+        # source reposts an unchanged screen when asked to refresh.
+        requested = time.perf_counter()
+        self.attach()
+        try:
+            self.mirror.source.refresh()
+            self.mirror.rate.poke()
+            with self._cond:
+                if not self._cond.wait_for(lambda: self.captured_at >= requested, timeout):
+                    return None
+                return self.jpeg
+        finally:
+            self.detach()
+
+    def wait_frame(self, after, timeout=5.0):
+        # (seq, jpeg) newer than `after`, or None on timeout.
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.seq > after, timeout):
+                return None
+            if after:
+                self.skipped += self.seq - after - 1
+            return self.seq, self.jpeg
+
+
+class MJPEGHandler(BaseHTTPRequestHandler):
+    # GET /                   index page with every attached device
+    # GET /stream/<serial>    multipart/x-mixed-replace MJPEG stream
+    # GET /snapshot/<serial>  latest JPEG
+    send_buffer = 32 * 1024  # at most a frame or so queued in the kernel per viewer
+    send_timeout = 10.0
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if parts == [""]:
+            return self.index()
+        if len(parts) == 2 and parts[0] in ("stream", "snapshot"):
+            serial = parts[1]
+            if serial not in self.server.serials():
+                return self.send_error(404, f"no device {serial}")
+            feed = self.server.feed(serial)
+            return self.stream(feed) if parts[0] == "stream" else self.snapshot(feed)
+        self.send_error(404)
+
+    def index(self):
+        images = "".join(f'<figure><img src="/stream/{s}" style="max-height:80vh">'
+                         f"<figcaption>{s}</figcaption></figure>" for s in self.server.serials())
+        body = f"<!doctype html><title>HopeMirror</title><body style='display:flex'>{images}</body>"
+        self.reply(200, "text/html; charset=utf-8", body.encode("utf-8"))
+
+    def snapshot(self, feed):
+        jpeg = feed.snapshot()
+        if jpeg is None:
+            return self.send_error(504, "no frame from device")
+        self.reply(200, "image/jpeg", jpeg)
+
+    def stream(self, feed):
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        self.connection.settimeout(self.send_timeout)
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        feed.attach()
+        seq = 0
+        try:
+            while not self.server.stopping:
+                item = feed.wait_frame(seq)
+                if item is None:
+                    # still screen: nothing was written, so ask the socket
+                    if self.viewer_gone():
+                        break
+                    continue
+                seq, jpeg = item
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii") + jpeg + b"\r\n")
+        except OSError:
+            pass  # viewer went away or stalled past send_timeout
+        finally:
+            feed.detach()
+            self.close_connection = True
+
+    def viewer_gone(self):
+        # A viewer never sends anything after the request, so a readable
+        # socket that peeks empty has been closed by the browser.
+        readable, _, _ = select.select([self.connection], [], [], 0)
+        return bool(readable) and self.connection.recv(1, socket.MSG_PEEK) == b""
+
+    def reply(self, code, content_type, body):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MJPEGServer(ThreadingHTTPServer):
+    # Headless fan-out: one DeviceFeed per serial, captured through a shared
+    # CapturePool, served to any number of HTTP viewers.
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=8080, client=None, backend="raw", fps=10, quality=75,
+                 scale=1.0, max_in_flight=4):
+        super().__init__((host, port), MJPEGHandler)
+        self.client = client or default_client()
+        self.pool = CapturePool(max_in_flight)
+        self.options = dict(backend=backend, fps=fps, quality=quality, scale=scale)
+        self.feeds = {}
+        self.stopping = False
+        self._lock = threading.Lock()
+
+    def serials(self):
+        return [serial for serial, state in self.client.devices() if state == "device"]
+
+    def feed(self, serial):
+        with self._lock:
+            if serial not in self.feeds:
+                self.feeds[serial] = DeviceFeed(serial, self.pool, self.client, **self.options)
+            return self.feeds[serial]
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self):
+        self.stopping = True
+        super().shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve device screens as MJPEG over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to let other machines watch")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--backend", choices=source_names(), default="raw")
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--quality", type=int, default=75)
+    parser.add_argument("--scale", type=float, default=0.5)
+    args = parser.parse_args()
+    server = MJPEGServer(args.host, args.port, backend=args.backend, fps=args.fps,
+                         quality=args.quality, scale=args.scale)
+    print(f"Serving http://{args.host}:{server.port}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class FrameRateController:
+    # Paces a polling capture loop. The interval runs from begin(), so the
+    # time spent fetching, comparing and decoding a frame comes out of it
+    # instead of adding to it. It doubles for every consecutive identical
+    # frame (up to max_interval), and poke() snaps back to the full rate,
+    # e.g. right after user input.
+    def __init__(self, target_fps=12, max_interval=2.0):
+        self.target_fps = target_fps
+        self.max_interval = max_interval
+        self.idle_frames = 0
+        self.due = time.monotonic()
+        self._started = self.due
+        self._last_data = None
+        self._wake = threading.Event()
+        self.on_poke = None
+
+    @property
+    def interval(self):
+        base = 1.0 / self.target_fps
+        return min(self.max_interval, base * 2 ** min(self.idle_frames, 16))
+
+    def begin(self):
+        self._started = time.monotonic()
+
+    def frame_done(self, data):
+        changed = data != self._last_data
+        self._last_data = data
+        self.idle_frames = 0 if changed else self.idle_frames + 1
+        self.due = self._started + self.interval
+        return changed
+
+    def frame_failed(self):
+        self.due = time.monotonic() + self.interval
+
+    def poke(self):
+        self.idle_frames = 0
+        self.due = time.monotonic()
+        self._wake.set()
+        if self.on_poke:
+            self.on_poke()
+
+    def wait(self, stop_event):
+        while not stop_event.is_set():
+            delay = self.due - time.monotonic()
+            if delay <= 0:
+                return
+            self._wake.wait(delay)
+            self._wake.clear()
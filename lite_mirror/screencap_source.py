@@ -0,0 +1,154 @@
+import functools
+import threading
+import time
+from .capture import BACKENDS, RawFormatError, peek_size, decode_region
+
+
+class ScreencapSource:
+    # `screencap` (PNG or raw framebuffer) one frame at a time, paced by the
+    # mirror's FrameRateController through the shared CapturePool or a
+    # thread of its own. Frames go to the mirror's mailbox as
+    # (started, img, view); view is the device rectangle the picture shows,
+    # which is the mirror's roi when zoomed in.
+    zoom = True        # can capture just a region at native resolution
+    resizable = False  # the window follows the frame size
+    records = False
+
+    def __init__(self, mirror, backend):
+        self.mirror = mirror
+        self.backend = backend
+        self.job = None
+        self._shown_roi = None  # roi of the last frame posted
+        self._refreshes = 0  # refresh() calls
+        self._posted = 0  # refresh() calls seen by the last frame posted
+
+    def start(self):
+        m = self.mirror
+        if m.pool is None:
+            threading.Thread(target=self.stream_loop, daemon=True).start()
+        else:
+            self.job = m.pool.register(m.serial, self.capture_once, m.rate)
+
+    def stop(self):
+        if self.job is not None:
+            self.mirror.pool.unregister(self.job)
+
+    def status(self):
+        return ""
+
+    def tick(self):
+        pass  # rotation shows up in the frame size
+
+    def refresh(self):
+        # Post the next frame even if the screen hasn't changed.
+        self._refreshes += 1
+
+    def stream_loop(self):
+        m = self.mirror
+        stop = m.stop_event
+        while not stop.is_set():
+            m.rate.wait(stop)
+            try:
+                self.capture_once()
+            except Exception as e:
+                m.rate.frame_failed()
+                print(f"[{m.serial}] Screenshot error:", e)
+
+    def capture_once(self):
+        m = self.mirror
+        refreshes = self._refreshes  # before `started`: a refresh after it waits a frame
+        m.rate.begin()
+        started = time.perf_counter()
+        roi = m.roi
+        offload = m.decoder is not None and roi is None
+        data, img = self.grab(roi, refreshes, offload)
+        if data is None:
+            return
+        if offload:
+            return self.submit(started, data, img)
+        if roi is None:
+            m.last_frame = img
+            size = img.size
+        else:
+            m.last_frame = functools.partial(BACKENDS[self.backend][1], data)
+            size = peek_size(self.backend, data)
+        if size != (m.dev_w, m.dev_h):
+            # screencap follows the display rotation, so a new frame shape
+            # means the device turned; the canvas follows in refresh_display.
+            m.set_device_size(*size)
+            if roi is not None:
+                m.roi = None  # the zoomed rectangle is meaningless now
+                self._shown_roi = roi  # so the next capture posts the full view
+                return
+        if roi is None:
+            view, target = (0, 0, m.dev_w, m.dev_h), (m.win_w, m.win_h)
+        else:
+            view, target = (roi[0], roi[1], img.width, img.height), self.zoom_size(img.size)
+        if img.size != target:
+            with m.metrics.stage("resize"):
+                img = img.resize(target)
+        self._shown_roi = roi
+        m.mailbox.put((started, img, view))
+
+    def grab(self, roi=None, refreshes=0, peek=False):
+        # One screencap as (data, img), or (None, None) when the bytes are
+        # the same as last time and nothing asks for a new picture. The
+        # bytes are compared before decoding: an unchanged PNG would
+        # otherwise be inflated in full just to be thrown away. With `peek`
+        # img is only the frame size, for the decode pool to do the rest.
+        m = self.mirror
+        try:
+            data = self.fetch()
+            if not m.rate.frame_done(data) and roi == self._shown_roi and refreshes == self._posted:
+                m.metrics.count("identical")
+                return None, None
+            self._posted = refreshes
+            if peek:
+                return data, peek_size(self.backend, data)
+            with m.metrics.stage("decode"):
+                return data, self.decode(data, roi)
+        except RawFormatError as e:
+            print(f"[{m.serial}] Raw capture unsupported, falling back to PNG:", e)
+            self.backend = "png"
+            return self.grab(roi, refreshes, peek)
+        except Exception:
+            m.metrics.count("errors")
+            raise
+
+    def zoom_size(self, size):
+        # Native resolution, unless that's over 1.5x the normal window.
+        w, h = size
+        m = self.mirror
+        fit = min(1.0, 1.5 * max(m.win_w, m.win_h) / max(w, h))
+        return max(1, int(w * fit)), max(1, int(h * fit))
+
+    def submit(self, started, data, size):
+        # Decode and scale run in the decode pool's processes; this thread is
+        # free for the next capture as soon as the bytes are handed over.
+        m = self.mirror
+        self._shown_roi = None
+        m.last_frame = functools.partial(BACKENDS[self.backend][1], data)
+        if size != (m.dev_w, m.dev_h):
+            m.set_device_size(*size)
+        submitted = time.perf_counter()
+
+        def done(img):
+            m.metrics.record("decode", time.perf_counter() - submitted)
+            m.mailbox.put((started, img, (0, 0) + size))
+
+        def failed(e):
+            m.metrics.count("errors")
+            print(f"[{m.serial}] Decode error:", e)
+
+        if not m.decoder.submit(self.backend, data, (m.win_w, m.win_h), done, failed):
+            m.metrics.count("decode_busy")
+
+    def fetch(self):
+        m = self.mirror
+        with m.metrics.stage("capture"):
+            return m.client.exec_out(m.serial, BACKENDS[self.backend][0])
+
+    def decode(self, data, roi=None):
+        if roi is not None:
+            return decode_region(self.backend, data, roi)
+        return BACKENDS[self.backend][1](data)
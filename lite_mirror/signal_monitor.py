@@ -0,0 +1,235 @@
+import collections
+import csv
+import re
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+from .adb_client import default_client
+
+UNAVAILABLE = 2147483647  # CellInfo.UNAVAILABLE
+FIELDS = ("time", "rat", "band", "rsrp", "rsrq", "sinr")
+
+# Key/value pairs inside mSignalStrength, e.g. "rsrp=-95" (LTE) or
+# "ssRsrp = -88" (NR); the NR ones win when the phone is on 5G.
+_VALUE = re.compile(r"\b(rsrp|rsrq|rssnr|ssRsrp|ssRsrq|ssSinr)\s*=\s*(-?\d+)")
+_BANDS = re.compile(r"\bmBands\s*=\s*\[\s*(\d+)")
+_BAND = re.compile(r"\bmBand\s*=\s*(\d+)")
+
+
+def _valid(value, low, high):
+    value = int(value)
+    return value if value != UNAVAILABLE and low <= value <= high else None
+
+
+class SignalParser:
+    # Line-by-line parser for `dumpsys telephony.registry`. The first phone
+    # (SIM slot) with a valid signal strength is read, e.g. slot 1 when
+    # slot 0 has no SIM; feed() returns True once nothing more is needed so
+    # the caller can hang up instead of reading the whole dump.
+    def __init__(self):
+        self.sample = {"rat": None, "band": None, "rsrp": None, "rsrq": None, "sinr": None}
+        self.have_signal = False
+
+    def feed(self, line):
+        line = line.strip()
+        if line.startswith("Phone Id="):
+            if self.have_signal:
+                return True  # the previous phone had it
+            self.sample["band"] = None  # that phone's band goes with it
+            return False
+        if line.startswith("mSignalStrength="):
+            self._signal(line)
+        elif self.sample["band"] is None:
+            m = _BANDS.search(line) or _BAND.search(line)
+            if m and int(m.group(1)) > 0:
+                self.sample["band"] = int(m.group(1))
+        return self.have_signal and self.sample["band"] is not None
+
+    def _signal(self, line):
+        lte, nr = {}, {}
+        for key, value in _VALUE.findall(line):
+            (nr if key.startswith("ss") else lte)[key] = value
+        s = self.sample
+        if _valid(nr.get("ssRsrp", UNAVAILABLE), -156, -31) is not None:
+            s["rat"] = "NR"
+            s["rsrp"] = _valid(nr["ssRsrp"], -156, -31)
+            s["rsrq"] = _valid(nr.get("ssRsrq", UNAVAILABLE), -43, 20)
+            s["sinr"] = _valid(nr.get("ssSinr", UNAVAILABLE), -23, 40)
+        elif _valid(lte.get("rsrp", UNAVAILABLE), -140, -43) is not None:
+            s["rat"] = "LTE"
+            s["rsrp"] = _valid(lte["rsrp"], -140, -43)
+            s["rsrq"] = _valid(lte.get("rsrq", UNAVAILABLE), -34, 3)
+            s["sinr"] = _valid(lte.get("rssnr", UNAVAILABLE), -20, 30)
+        else:
+            return  # no SIM or no service in this slot
+        self.have_signal = True
+
+
+def read_signal(client, serial):
+    # Streams the dump and closes the socket as soon as the parser is done,
+    # which also stops dumpsys on the device.
+    parser = SignalParser()
+    sock = client.open_service(serial, "shell:dumpsys telephony.registry")
+    try:
+        with sock.makefile("rb") as f:
+            for raw in f:
+                if parser.feed(raw.decode("utf-8", "replace")):
+                    break
+    finally:
+        sock.close()
+    if not parser.have_signal:
+        raise RuntimeError("no valid mSignalStrength in dumpsys telephony.registry")
+    sample = dict(parser.sample)
+    sample["time"] = time.time()
+    return sample
+
+
+def export_csv(samples, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for sample in samples:
+            row = dict(sample)
+            row["time"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sample["time"]))
+            writer.writerow(row)
+    return path
+
+
+class SignalMonitor:
+    # One background thread polls every watched device and appends to a
+    # fixed-size series per serial (default: 6 hours at one sample per 30 s).
+    # Readers on the Tk side just look at `series`; nothing here blocks them.
+    def __init__(self, client=None, interval=30.0, history=720):
+        self.client = client or default_client()
+        self.interval = interval
+        self.history = history
+        self.series = {}
+        self.errors = {}
+        self._watchers = collections.Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._started = False
+
+    def watch(self, serial):
+        with self._lock:
+            self._watchers[serial] += 1
+            self.series.setdefault(serial, collections.deque(maxlen=self.history))
+            if not self._started:
+                self._started = True
+                threading.Thread(target=self._poll_loop, daemon=True).start()
+        self._wake.set()  # first sample now, not after a full interval
+
+    def unwatch(self, serial):
+        with self._lock:
+            self._watchers[serial] -= 1
+            if self._watchers[serial] <= 0:
+                del self._watchers[serial]
+
+    def samples(self, serial):
+        with self._lock:
+            return list(self.series.get(serial, ()))
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                serials = list(self._watchers)
+            for serial in serials:
+                try:
+                    sample = read_signal(self.client, serial)
+                except Exception as e:
+                    self.errors[serial] = str(e)
+                    continue
+                self.errors.pop(serial, None)
+                with self._lock:
+                    self.series[serial].append(sample)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_default_monitor = None
+_default_lock = threading.Lock()
+
+
+def default_monitor():
+    global _default_monitor
+    with _default_lock:
+        if _default_monitor is None:
+            _default_monitor = SignalMonitor()
+        return _default_monitor
+
+
+class SignalView(tk.Toplevel):
+    # Live RSRP / RSRQ / SINR sparklines for one device, redrawn from the
+    # monitor's series once a second.
+    refresh_ms = 1000
+    rows = (("rsrp", "RSRP", "dBm", "#40ff80"), ("rsrq", "RSRQ", "dB", "#40c0ff"),
+            ("sinr", "SINR", "dB", "#ffc040"))
+
+    def __init__(self, serial, monitor=None, width=360, row_h=60):
+        super().__init__()
+        self.serial = serial
+        self.monitor = monitor or default_monitor()
+        self.width = width
+        self.row_h = row_h
+        self.title(f"Signal – {serial}")
+        self.configure(bg="#202030")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.status = tk.Label(self, text="Waiting for first sample…", bg="#202030", fg="white",
+                               font=("Courier", 10), anchor="w")
+        self.status.pack(fill="x", padx=6, pady=4)
+        self.canvas = tk.Canvas(self, width=width, height=row_h * len(self.rows), bg="#101020",
+                                bd=0, highlightthickness=0)
+        self.canvas.pack(padx=6)
+        ttk.Button(self, text="Export CSV", command=self.export).pack(pady=6)
+
+        self.monitor.watch(serial)
+        self.refresh()
+
+    def refresh(self):
+        samples = self.monitor.samples(self.serial)
+        self.canvas.delete("all")
+        for i, (key, label, unit, color) in enumerate(self.rows):
+            self.draw_row(i * self.row_h, [s[key] for s in samples], f"{label} ({unit})", color)
+        if samples:
+            s = samples[-1]
+            band = f"B{s['band']}" if s["band"] else "band ?"
+            self.status.config(text=f"{s['rat'] or '?'} {band}  {len(samples)} samples  "
+                                    f"{time.strftime('%H:%M:%S', time.localtime(s['time']))}")
+        elif self.serial in self.monitor.errors:
+            self.status.config(text=self.monitor.errors[self.serial][:60])
+        self._job = self.after(self.refresh_ms, self.refresh)
+
+    def draw_row(self, top, values, label, color):
+        points = [(i, v) for i, v in enumerate(values) if v is not None]
+        last = f"{points[-1][1]}" if points else "–"
+        self.canvas.create_text(4, top + 2, anchor="nw", text=f"{label} {last}", fill=color,
+                                font=("Courier", 9))
+        if len(points) < 2:
+            return
+        low = min(v for _, v in points)
+        high = max(v for _, v in points)
+        span = max(high - low, 1)
+        step = self.width / max(len(values) - 1, 1)
+        h = self.row_h - 20
+        coords = []
+        for i, v in points:
+            coords += [i * step, top + 16 + h - (v - low) * h / span]
+        self.canvas.create_line(*coords, fill=color)
+        self.canvas.create_text(self.width - 4, top + 2, anchor="ne", text=f"{low}..{high}",
+                                fill="#808090", font=("Courier", 8))
+
+    def export(self):
+        samples = self.monitor.samples(self.serial)
+        if not samples:
+            messagebox.showerror("Export Error", "No samples yet")
+            return
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = export_csv(samples, f"signal_{self.serial}_{timestamp}.csv")
+        messagebox.showinfo("Signal Saved", f"Saved to {filename}")
+
+    def on_close(self):
+        self.after_cancel(self._job)
+        self.monitor.unwatch(self.serial)
+        self.destroy()
@@ -0,0 +1,33 @@
+import importlib
+
+# Capture backends a mirror can be opened with. Entries are a class or a
+# "module:Class" name inside this package that is imported the first time a
+# mirror uses it, so numpy, PIL and av stay out of the launcher. The wall
+# and the MJPEG server run them on a HeadlessMirror (see headless.py).
+SOURCES = {
+    "raw": "screencap_source:ScreencapSource",
+    "png": "screencap_source:ScreencapSource",
+    "h264": "h264_source:H264Source",
+}
+
+
+def register_source(name, factory):
+    # factory(mirror, name) -> source; a class or a "module:Class" string.
+    SOURCES[name] = factory
+
+
+def source_names():
+    return list(SOURCES)
+
+
+def load_source(name):
+    factory = SOURCES[name]
+    if isinstance(factory, str):
+        module, attr = factory.split(":")
+        factory = getattr(importlib.import_module("." + module, __package__), attr)
+        SOURCES[name] = factory
+    return factory
+
+
+def create_source(name, mirror):
+    return load_source(name)(mirror, name)
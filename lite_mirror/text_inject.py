@@ -0,0 +1,126 @@
+import base64
+import threading
+import time
+
+ADB_KEYBOARD = "com.android.adbkeyboard/.AdbIME"
+KEYCODE_TAB = 61
+KEYCODE_ENTER = 66
+KEYS = {"\n": KEYCODE_ENTER, "\t": KEYCODE_TAB}
+
+
+def input_text_chunks(text, size=200):
+    # Pieces for `input text`. It turns "%s" into a space and can't take a
+    # literal space, so spaces become %s and a literal "%s" in the text is
+    # split across two calls. Arguments are shell-quoted by ShellSession.
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        cut = text.find("%s", start, end + 1)
+        if cut != -1 and cut + 1 <= end:
+            end = cut + 1
+        pieces.append(text[start:end].replace(" ", "%s"))
+        start = end
+    return pieces
+
+
+def plan_input(text, size=200):
+    # argv lists for typing `text` with the stock `input` tool: text runs as
+    # `input text`, newlines and tabs as one `input keyevent` per run.
+    commands = []
+    run = []
+    keys = []
+    for ch in text.replace("\r\n", "\n"):
+        if ch in KEYS:
+            if run:
+                commands += [("input", "text", p) for p in input_text_chunks("".join(run), size)]
+                run = []
+            keys.append(KEYS[ch])
+        else:
+            if keys:
+                commands.append(("input", "keyevent", *keys))
+                keys = []
+            run.append(ch)
+    if run:
+        commands += [("input", "text", p) for p in input_text_chunks("".join(run), size)]
+    if keys:
+        commands.append(("input", "keyevent", *keys))
+    return commands
+
+
+def plan_ime(text, size=4000):
+    # ADBKeyboard commits a whole broadcast at once, Unicode and newlines
+    # included; base64 keeps the payload clear of shell and intent quoting.
+    return [
+        ("am", "broadcast", "-a", "ADB_INPUT_B64", "--es", "msg",
+         base64.b64encode(text[i:i + size].encode("utf-8")).decode("ascii"))
+        for i in range(0, len(text), size)
+    ]
+
+
+class TextInjector:
+    # Types text on a device over its persistent ShellSession. Every chunk is
+    # queued at once so the device runs them back to back; only the last one
+    # is acknowledged. When ADBKeyboard is the active IME (or installed and
+    # the text isn't plain ASCII) the text goes in as base64 broadcasts
+    # instead of character-by-character `input text`.
+    def __init__(self, shell, chunk=200, ime_chunk=4000):
+        self.shell = shell
+        self.chunk = chunk
+        self.ime_chunk = ime_chunk
+        self.ime = None  # "active", "installed" or "" once probed
+        self.current_ime = None
+        self._lock = threading.Lock()
+
+    def probe(self):
+        installed = ADB_KEYBOARD in self.shell.run("ime", "list", "-s")
+        self.current_ime = self.shell.run("settings", "get", "secure", "default_input_method").strip()
+        if self.current_ime == ADB_KEYBOARD:
+            self.ime = "active"
+        else:
+            self.ime = "installed" if installed else ""
+        return self.ime
+
+    def plan(self, text):
+        if self.ime == "active" or (self.ime == "installed" and not text.isascii()):
+            commands = plan_ime(text, self.ime_chunk)
+            if self.ime == "installed":
+                # switch to ADBKeyboard for this paste only
+                commands = ([("ime", "set", ADB_KEYBOARD), ("sleep", "0.3")] + commands +
+                            [("ime", "set", self.current_ime)])
+            return commands
+        if not text.isascii():
+            print(f"[{self.shell.serial}] Non-ASCII text without ADBKeyboard may not type correctly")
+        return plan_input(text, self.chunk)
+
+    def inject(self, text, on_done=None):
+        # Returns at once; probing and queueing happen off the caller's
+        # thread. on_done(cmd, seconds) runs when the device has finished.
+        threading.Thread(target=self._inject, args=(text, on_done), daemon=True).start()
+
+    def inject_sync(self, text, timeout=60.0):
+        done = threading.Event()
+        result = []
+        self.inject(text, lambda cmd, seconds: (result.append((cmd, seconds)), done.set()))
+        done.wait(timeout)
+        return result[0] if result else (None, None)
+
+    def _inject(self, text, on_done):
+        if not text:
+            return
+        started = time.monotonic()
+        with self._lock:  # one paste at a time keeps the text in order
+            try:
+                if self.ime is None:
+                    self.probe()
+            except Exception as e:
+                print(f"[{self.shell.serial}] IME probe failed, using input text:", e)
+                self.ime = ""
+            commands = self.plan(text)
+            for args in commands[:-1]:
+                self.shell.send(*args)
+            last = commands[-1]
+        callback = None
+        if on_done:
+            callback = lambda cmd: on_done(cmd, time.monotonic() - started)
+        self.shell.send(*last, ack=True, callback=callback)
@@ -0,0 +1,67 @@
+import numpy as np
+from PIL import ImageTk
+
+
+class TileBlitter:
+    # Owns the one PhotoImage shown on a canvas item. New frames are diffed
+    # against the previous one in tile x tile blocks and only the changed
+    # blocks are pushed to Tk; identical frames are skipped entirely.
+    def __init__(self, canvas, img_id, tile=64, full_ratio=0.5):
+        self.canvas = canvas
+        self.img_id = img_id
+        self.tile = tile
+        self.full_ratio = full_ratio
+        self.photo = None
+        self.full_blits = 0
+        self.tile_blits = 0
+        self.skipped = 0
+        self._prev = None
+
+    def show(self, img):
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        arr = np.asarray(img)
+        if self._prev is None or arr.shape != self._prev.shape:
+            self.photo = ImageTk.PhotoImage(img)
+            self.canvas.itemconfig(self.img_id, image=self.photo)
+            self.full_blits += 1
+        else:
+            boxes = self.dirty_boxes(self._prev, arr)
+            if not boxes:
+                self.skipped += 1
+                return
+            area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+            if area > self.full_ratio * arr.shape[0] * arr.shape[1]:
+                self.photo.paste(img)
+                self.full_blits += 1
+            else:
+                for box in boxes:
+                    patch = ImageTk.PhotoImage(img.crop(box))
+                    self.canvas.tk.call(str(self.photo), "copy", str(patch), "-to", box[0], box[1])
+                self.tile_blits += len(boxes)
+        self._prev = arr
+
+    def paste(self, patch, x, y):
+        # For callers that already know what changed (the wall): pushes one
+        # region into the photo without diffing. show() must have run once.
+        tmp = ImageTk.PhotoImage(patch)
+        self.canvas.tk.call(str(self.photo), "copy", str(tmp), "-to", x, y)
+        self.tile_blits += 1
+        self._prev = None
+
+    def dirty_boxes(self, prev, cur):
+        t = self.tile
+        h, w = cur.shape[:2]
+        changed = (prev != cur).any(axis=2)
+        rows = np.logical_or.reduceat(changed, np.arange(0, h, t), axis=0)
+        tiles = np.logical_or.reduceat(rows, np.arange(0, w, t), axis=1)
+        boxes = []
+        for r, row in enumerate(tiles):
+            cols = np.flatnonzero(row)
+            if not len(cols):
+                continue
+            # merge horizontally adjacent dirty tiles into one strip
+            splits = np.flatnonzero(np.diff(cols) > 1) + 1
+            for run in np.split(cols, splits):
+                boxes.append((int(run[0]) * t, r * t, min((int(run[-1]) + 1) * t, w), min((r + 1) * t, h)))
+        return boxes
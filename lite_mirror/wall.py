@@ -0,0 +1,223 @@
+import math
+import threading
+import tkinter as tk
+import numpy as np
+from PIL import Image
+from .adb_client import default_client
+from .adb_shell import get_session, release_session
+from .capture_pool import CapturePool
+from .gestures import GestureStreamer
+from .headless import HeadlessMirror
+from .tile_blit import TileBlitter
+
+
+class WallCompositor:
+    # One preallocated RGB mosaic with a cell per device. Capture threads
+    # downscale their frame straight into the device's cell (letterboxed to
+    # keep the aspect ratio) and mark it dirty; the Tk side takes only the
+    # dirty cells, so an idle wall costs nothing.
+    def __init__(self, serials, cell_w=180, cell_h=320, columns=None):
+        n = max(1, len(serials))
+        self.cell_w = cell_w
+        self.cell_h = cell_h
+        self.columns = columns or max(1, math.ceil(math.sqrt(n * cell_h / cell_w)))
+        self.rows = math.ceil(n / self.columns)
+        self.mosaic = np.zeros((self.rows * cell_h, self.columns * cell_w, 3), np.uint8)
+        self.order = list(serials)
+        self.cells = {
+            serial: ((i % self.columns) * cell_w, (i // self.columns) * cell_h)
+            for i, serial in enumerate(serials)
+        }
+        self.fits = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self.mosaic.shape[1], self.mosaic.shape[0]
+
+    def fit_rect(self, serial, w, h):
+        cx, cy = self.cells[serial]
+        scale = min(self.cell_w / w, self.cell_h / h)
+        fw, fh = max(1, int(w * scale)), max(1, int(h * scale))
+        return cx + (self.cell_w - fw) // 2, cy + (self.cell_h - fh) // 2, fw, fh
+
+    def put(self, serial, img):
+        x, y, w, h = rect = self.fit_rect(serial, *img.size)
+        small = img if img.size == (w, h) else img.resize((w, h), Image.BILINEAR, reducing_gap=2.0)
+        arr = np.asarray(small if small.mode == "RGB" else small.convert("RGB"))
+        with self._lock:
+            if self.fits.get(serial) != rect:
+                # first frame or the device rotated: clear the old letterbox
+                cx, cy = self.cells[serial]
+                self.mosaic[cy:cy + self.cell_h, cx:cx + self.cell_w] = 0
+                self.fits[serial] = rect
+            self.mosaic[y:y + h, x:x + w] = arr
+            self._dirty.add(serial)
+
+    def take_dirty(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            patches = []
+            for serial in dirty:
+                cx, cy = self.cells[serial]
+                cell = self.mosaic[cy:cy + self.cell_h, cx:cx + self.cell_w]
+                patches.append((cx, cy, Image.fromarray(np.ascontiguousarray(cell))))
+        return patches
+
+    def locate(self, x, y):
+        # (serial, fx, fy) with fx, fy the position inside that device's
+        # picture as fractions, or None outside any picture.
+        col, row = int(x // self.cell_w), int(y // self.cell_h)
+        if not (0 <= col < self.columns and 0 <= row < self.rows):
+            return None
+        index = row * self.columns + col
+        if index >= len(self.order):
+            return None
+        serial = self.order[index]
+        rect = self.fits.get(serial)
+        if rect is None:
+            return None
+        fx, fy, fw, fh = rect
+        return serial, min(max((x - fx) / fw, 0.0), 1.0), min(max((y - fy) / fh, 0.0), 1.0)
+
+
+def fit_grid(n, max_w, max_h, cell_w=180, aspect=16 / 9):
+    # (cell_w, cell_h, columns) for n portrait cells inside max_w x max_h,
+    # no wider than cell_w: the column count that allows the largest cell.
+    best = None
+    for columns in range(1, max(1, n) + 1):
+        rows = math.ceil(max(1, n) / columns)
+        w = int(min(cell_w, max_w / columns, max_h / rows / aspect))
+        if best is None or w > best[0]:
+            best = (w, columns)
+    w, columns = best
+    return max(16, w), max(16, int(w * aspect)), columns
+
+
+class WallTile:
+    # One device on the wall: any registered source, run headless at cell
+    # size, drawing straight into the compositor.
+    def __init__(self, serial, compositor, client, backend, target_fps, pool=None, registry=None):
+        self.serial = serial
+        self.compositor = compositor
+        self.mirror = HeadlessMirror(serial, backend, client, pool=pool, registry=registry,
+                                     fit=(compositor.cell_w, compositor.cell_h), target_fps=target_fps,
+                                     on_frame=self.on_frame)
+        self.shell = get_session(serial)
+        self.gesture = GestureStreamer(self.shell, on_send=self.mirror.rate.poke)
+        self.started = False
+        self.closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def dev_size(self):
+        m = self.mirror
+        return (m.dev_w, m.dev_h) if m.dev_w else None
+
+    def start(self):
+        # Without a cached size the mirror asks `wm size`; not on the Tk
+        # thread.
+        threading.Thread(target=self._start, daemon=True).start()
+
+    def _start(self):
+        try:
+            self.mirror.start()
+        except Exception as e:
+            print(f"[{self.serial}] Wall tile failed to start:", e)
+            return
+        with self._lock:
+            self.started = True
+            closed = self.closed
+        if closed:
+            self.mirror.stop()
+
+    def on_frame(self, item):
+        self.compositor.put(self.serial, item[1])
+
+    def map_coords(self, fx, fy):
+        w, h = self.dev_size
+        return int(fx * (w - 1)), int(fy * (h - 1))
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            started = self.started
+        if started:
+            self.mirror.stop()
+        release_session(self.serial)
+
+
+class WallView(tk.Toplevel):
+    # Every selected device tiled into one canvas and one PhotoImage, pushed
+    # to Tk at a single shared rate instead of one window per phone.
+    refresh_ms = 50
+
+    def __init__(self, serials, pool=None, registry=None, cell_w=180, backend="raw", target_fps=6):
+        super().__init__()
+        self.title(f"HopeMirror Wall – {len(serials)} devices")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.pool = pool or CapturePool(max_in_flight=4)
+        # Shrink the cells until the whole wall fits on the screen, leaving
+        # room for the title bar and taskbar.
+        cell_w, cell_h, columns = fit_grid(len(serials), self.winfo_screenwidth() * 0.95,
+                                           self.winfo_screenheight() * 0.85, cell_w)
+        self.compositor = WallCompositor(serials, cell_w, cell_h, columns)
+        client = default_client()
+
+        w, h = self.compositor.size
+        self.canvas = tk.Canvas(self, width=w, height=h, bg="black", bd=0, highlightthickness=0)
+        self.canvas.pack()
+        self.img_id = self.canvas.create_image(0, 0, anchor="nw", image=None)
+        self.blitter = TileBlitter(self.canvas, self.img_id)
+        self.blitter.show(Image.fromarray(self.compositor.mosaic))
+        for serial, (cx, cy) in self.compositor.cells.items():
+            self.canvas.create_text(cx + 4, cy + 4, anchor="nw", text=serial,
+                                    fill="#40ff80", font=("Courier", 8))
+
+        self.tiles = {}
+        for serial in serials:
+            tile = WallTile(serial, self.compositor, client, backend, target_fps, self.pool, registry)
+            tile.start()
+            self.tiles[serial] = tile
+        self._touch = None
+
+        self.canvas.bind("<ButtonPress-1>", self.on_press)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.refresh_display()
+
+    def refresh_display(self):
+        for x, y, patch in self.compositor.take_dirty():
+            self.blitter.paste(patch, x, y)
+        self._refresh_job = self.after(self.refresh_ms, self.refresh_display)
+
+    def on_press(self, ev):
+        hit = self.compositor.locate(ev.x, ev.y)
+        if hit is None or self.tiles[hit[0]].dev_size is None:
+            return
+        tile = self.tiles[hit[0]]
+        self.pool.set_focus(tile.serial)
+        self._touch = tile
+        tile.gesture.down(*tile.map_coords(hit[1], hit[2]))
+
+    def _touch_point(self, ev):
+        # Drags stay with the device they started on, clamped to its picture.
+        tile = self._touch
+        x, y, w, h = self.compositor.fits[tile.serial]
+        return tile.map_coords(min(max((ev.x - x) / w, 0.0), 1.0), min(max((ev.y - y) / h, 0.0), 1.0))
+
+    def on_drag(self, ev):
+        if self._touch is not None:
+            self._touch.gesture.move(*self._touch_point(ev))
+
+    def on_release(self, ev):
+        if self._touch is not None:
+            self._touch.gesture.up(*self._touch_point(ev))
+            self._touch = None
+
+    def on_close(self):
+        self.after_cancel(self._refresh_job)
+        for tile in self.tiles.values():
+            tile.close()
+        self.destroy()